@@ -5,13 +5,31 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException
 import time
 import os
+import shutil
+import socket
+import tracemalloc
+import queue
+import threading
 from selenium.webdriver.chrome.service import Service
+from streamlit.runtime.scriptrunner import add_script_run_ctx
 import csv
+import numpy as np
+import altair as alt
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import requests
+try:
+    import fcntl
+except ImportError:  # Not available on Windows, the profile is then used without a run lock
+    fcntl = None
+from orderbook_archive import init_orderbook_archive, flush_orderbook_archive, archive_orderbook
+from health import (
+    ALERT_THRESHOLD_CYCLES, ALERT_COOLDOWN_MINUTES,
+    init_health_state, record_cycle_data, evaluate_health_transitions, mark_alert_sent
+)
 
 # Load environment variables
 load_dotenv()
@@ -20,18 +38,64 @@ load_dotenv()
 # Logging Configuration
 LOG_DIRECTORY = "logs"
 LOG_ENABLED = True
+METRICS_DIRECTORY = os.path.join(LOG_DIRECTORY, "metrics")  # Per-cycle market metrics for history charts
 
 # Telegram Alert Configuration
-TELEGRAM_ENABLED = True  # Set to False to disable Telegram alerts
+TELEGRAM_ENABLED = os.getenv('TELEGRAM_ENABLED', 'true').lower() != 'false'  # Set to False to disable Telegram alerts
 # TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 # TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 TELEGRAM_BOT_TOKEN = st.secrets['TELEGRAM_BOT_TOKEN']
 TELEGRAM_CHAT_ID = st.secrets['TELEGRAM_CHAT_ID']
 
-# Alert Thresholds
-ALERT_THRESHOLD_CYCLES = 3        # Alert after 3 consecutive warning cycles
-ALERT_COOLDOWN_MINUTES = 30       # Don't re-alert for 30 minutes
-PERSISTENT_LOG_INTERVAL = 5       # Log WARNING_PERSISTENT every 5 cycles
+# Browser Profile Configuration
+CHROME_PROFILE_ENABLED = os.getenv('CHROME_PROFILE_ENABLED', 'false').lower() == 'true'  # Reuse profile and HTTP cache across restarts
+CHROME_PROFILE_DIRECTORY = os.path.abspath(os.getenv('CHROME_PROFILE_DIRECTORY', "chrome_profile"))
+CHROME_CACHE_MAX_BYTES = 200 * 1024 ** 2  # Disk cache cap passed to Chrome and enforced at startup
+
+# Pipeline Configuration
+PIPELINE_QUEUE_SIZE = 8           # Scraped books waiting for processing before the driver blocks
+
+# Pre-screen Configuration
+PRESCREEN_ENABLED = os.getenv('PRESCREEN_ENABLED', 'true').lower() != 'false'
+PRESCREEN_TICKER_URL = os.getenv('MONITOR_TICKER_URL', "https://www.quidax.com/api/v1/markets/tickers")
+PRESCREEN_SPREAD_CHANGE = 0.25    # Deep-scrape if top-of-book spread moved by 25% of target since the last deep scrape
+PRESCREEN_MID_CHANGE_PCT = 1.0    # Deep-scrape if mid price moved by 1% since the last deep scrape
+PRESCREEN_MAX_SKIP_CYCLES = 5     # Deep-scrape every market at least every 5 cycles
+
+# Circuit Breaker Configuration
+CIRCUIT_FAILURE_THRESHOLD = 3     # Open the circuit after 3 consecutive failed scrapes
+CIRCUIT_BASE_BACKOFF_CYCLES = 1   # Skip 1 cycle the first time a circuit opens
+CIRCUIT_MAX_BACKOFF_CYCLES = 32   # Never skip more than 32 cycles between probes
+
+# Adaptive Timeout Configuration
+WAIT_TIMEOUT_DEFAULT = 10         # Seconds, used until enough latency samples exist
+WAIT_TIMEOUT_MIN = 3              # Lower clamp for learned timeouts
+WAIT_TIMEOUT_MAX = 20             # Upper clamp for learned timeouts
+WAIT_TIMEOUT_PERCENTILE = 95      # Load-latency percentile the timeout is based on
+WAIT_TIMEOUT_MULTIPLIER = 1.5     # Headroom applied on top of the percentile
+LATENCY_SAMPLE_WINDOW = 50        # Keep the last 50 load latencies per market
+LATENCY_MIN_SAMPLES = 5           # Samples needed before learning a timeout
+
+# Memory Profiling Configuration
+MEMORY_PROFILING_ENABLED = os.getenv('MEMORY_PROFILING_ENABLED', 'false').lower() == 'true'  # Track memory growth across cycles
+MEMORY_SNAPSHOT_INTERVAL = 10     # Take a memory snapshot every 10 cycles
+MEMORY_TOP_SITES = 15             # Number of growing allocation sites to report
+MEMORY_TRACE_FRAMES = 5           # Stack frames recorded per allocation
+MEMORY_HISTORY_LENGTH = 200       # Samples kept for the diagnostics chart
+
+# Slippage Configuration
+SLIPPAGE_NOTIONALS = [1_000, 10_000, 100_000]  # Order sizes in USD
+SLIPPAGE_USD_RATE_PAIRS = {'NGN': 'USDT_NGN'}  # Pair whose mid converts USD sizes into each non-USDT quote
+SLIPPAGE_METRICS = [
+    f"slippage_{side}_{int(notional / 1000)}k" for notional in SLIPPAGE_NOTIONALS for side in ('buy', 'sell')
+]
+
+# History Chart Configuration
+HISTORY_METRICS = ['spread', 'dws', 'depth_25', 'depth_50'] + SLIPPAGE_METRICS
+METRICS_COLUMNS = ['timestamp', 'symbol'] + HISTORY_METRICS  # Only ever append new columns
+HISTORY_RESOLUTIONS = [('1 s', 1), ('1 min', 60), ('15 min', 900), ('1 h', 3600)]
+HISTORY_MAX_BUCKETS = 5000        # Use the finest resolution with at most 5000 buckets in range
+HISTORY_CHART_POINTS = 1000       # Points sent to the browser after LTTB downsampling
 
 
 # --- Improved Parse Function ---
@@ -228,6 +292,120 @@ def calculate_dws(asks_df, bids_df, num_levels=10):
     return dws
 
 
+def calculate_price_impact(asks_df, bids_df, notional_sizes):
+    """
+    Calculate average fill price and slippage versus mid for market orders of several sizes.
+    
+    Each side is walked once into cumulative quote-value and base-amount arrays;
+    every size is then resolved with a binary search into those arrays, with
+    the last level filled partially.
+    
+    Args:
+        asks_df: DataFrame with ask orders (price, amount, total)
+        bids_df: DataFrame with bid orders (price, amount, total)
+        notional_sizes: Order sizes in quote currency (USDT or NGN)
+        
+    Returns:
+        DataFrame indexed by notional size with buy_avg_price, buy_slippage_pct,
+        sell_avg_price and sell_slippage_pct columns. Values are NaN when the
+        book is empty or too thin to fill the size.
+    """
+    sizes = np.asarray(notional_sizes, dtype=np.float64)
+    impact = pd.DataFrame(
+        np.nan, index=pd.Index(notional_sizes, name='notional'),
+        columns=['buy_avg_price', 'buy_slippage_pct', 'sell_avg_price', 'sell_slippage_pct']
+    )
+    
+    asks = asks_df.dropna(subset=['price', 'amount']).sort_values('price', ascending=True)
+    bids = bids_df.dropna(subset=['price', 'amount']).sort_values('price', ascending=False)
+    if asks.empty or bids.empty:
+        return impact
+    
+    mid_price = (asks['price'].iloc[0] + bids['price'].iloc[0]) / 2
+    
+    def average_fill_prices(levels):
+        prices = levels['price'].to_numpy(dtype=np.float64)
+        amounts = levels['amount'].to_numpy(dtype=np.float64)
+        cum_quote = np.cumsum(prices * amounts)
+        cum_base = np.cumsum(amounts)
+        
+        # First level at which the cumulative quote value covers each size
+        k = np.searchsorted(cum_quote, sizes, side='left')
+        fillable = k < len(prices)
+        k = np.minimum(k, len(prices) - 1)
+        
+        quote_before = np.where(k > 0, cum_quote[k - 1], 0.0)
+        base_before = np.where(k > 0, cum_base[k - 1], 0.0)
+        base_filled = base_before + (sizes - quote_before) / prices[k]
+        
+        return np.where(fillable, sizes / base_filled, np.nan)
+    
+    buy_avg = average_fill_prices(asks)
+    sell_avg = average_fill_prices(bids)
+    
+    impact['buy_avg_price'] = buy_avg
+    impact['buy_slippage_pct'] = (buy_avg - mid_price) / mid_price * 100
+    impact['sell_avg_price'] = sell_avg
+    impact['sell_slippage_pct'] = (mid_price - sell_avg) / mid_price * 100
+    
+    return impact
+
+
+def get_mid_price(asks_df, bids_df):
+    """Get the mid price between the best ask and best bid, or None if either side is empty."""
+    best_ask = asks_df['price'].min()
+    best_bid = bids_df['price'].max()
+    if pd.isna(best_ask) or pd.isna(best_bid):
+        return None
+    return float((best_ask + best_bid) / 2)
+
+
+def get_quote_notionals(symbol, usd_rates):
+    """
+    Convert the USD slippage sizes into a market's quote currency.
+    
+    USDT is taken as USD; other quotes (NGN) use the rate last scraped from
+    their SLIPPAGE_USD_RATE_PAIRS pair.
+    
+    Args:
+        symbol: Trading pair symbol (e.g. BTC_NGN)
+        usd_rates: Dict of quote currency -> quote units per USD
+        
+    Returns:
+        List of order sizes in quote currency, or None if the rate is not known yet
+    """
+    quote = symbol.rsplit('_', 1)[-1].upper()
+    if quote == 'USDT':
+        return list(SLIPPAGE_NOTIONALS)
+    rate = usd_rates.get(quote)
+    if rate is None:
+        return None
+    return [notional * rate for notional in SLIPPAGE_NOTIONALS]
+
+
+def get_slippage_columns(impact):
+    """
+    Flatten a price impact table into slippage metrics and table display values.
+    
+    Args:
+        impact: DataFrame from calculate_price_impact for the quote-currency
+            equivalents of SLIPPAGE_NOTIONALS (in the same order), or None if
+            the sizes could not be converted
+        
+    Returns:
+        Tuple of (dict of SLIPPAGE_METRICS name -> value or None,
+                  dict of table column -> display string)
+    """
+    metrics, display = {}, {}
+    for i, notional in enumerate(SLIPPAGE_NOTIONALS):
+        for side in ('buy', 'sell'):
+            value = None if impact is None else impact[f'{side}_slippage_pct'].iloc[i]
+            value = None if pd.isna(value) else float(value)
+            metrics[f"slippage_{side}_{int(notional / 1000)}k"] = value
+            display[f"{side.title()} Slippage @ ${int(notional / 1000)}K"] = f"{value:.4f}%" if value is not None else "--"
+    return metrics, display
+
+
 def format_depth_value(depth_value):
     """
     Format depth value for display with K/M suffix.
@@ -283,7 +461,8 @@ def log_event(symbol, event_type, current_spread=None, target_spread=None,
     
     Args:
         symbol: Trading pair symbol
-        event_type: One of: WARNING_ENTERED, WARNING_CLEARED, WARNING_PERSISTENT, SCRAPE_FAILED
+        event_type: One of: WARNING_ENTERED, WARNING_CLEARED, WARNING_PERSISTENT, SCRAPE_FAILED,
+                    CIRCUIT_OPENED, CIRCUIT_CLOSED
         current_spread: Current spread percentage
         target_spread: Target spread percentage
         percent_diff: Percentage difference from target
@@ -307,6 +486,278 @@ def log_event(symbol, event_type, current_spread=None, target_spread=None,
         ])
 
 
+def log_events(events):
+    """
+    Log a batch of orderbook health events to CSV in a single write.
+    
+    Args:
+        events: List of dicts holding log_event keyword arguments
+    """
+    if not LOG_ENABLED or not events:
+        return
+    
+    log_file = get_log_filepath()
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    with open(log_file, 'a', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerows([
+            [
+                timestamp, e['symbol'], e['event_type'], e.get('current_spread'),
+                e.get('target_spread'), e.get('percent_diff'), e.get('dws'),
+                e.get('depth_25'), e.get('depth_50'), e.get('duration_cycles'),
+                e.get('notes', "")
+            ]
+            for e in events
+        ])
+
+
+# --- Metrics History Functions ---
+def get_metrics_filepath(date_str=None):
+    """Get the per-cycle metrics file path for a date (YYYY-MM-DD, default today)."""
+    date_str = date_str or datetime.now().strftime("%Y-%m-%d")
+    os.makedirs(METRICS_DIRECTORY, exist_ok=True)
+    return os.path.join(METRICS_DIRECTORY, f"metrics_{date_str}.csv")
+
+
+def append_csv_row(path, header, row):
+    """
+    Append a row to a CSV file, writing the header first if the file is new.
+    
+    Columns are only ever appended to these files, so an existing file whose
+    header is from an older schema gets its header rewritten in place; older
+    rows are shorter and read back with the new columns empty.
+    
+    Args:
+        path: CSV file path
+        header: List of column names
+        row: List of values
+    """
+    header_line = ",".join(header)
+    existing_header = None
+    if os.path.exists(path):
+        with open(path, newline='') as f:
+            existing_header = f.readline().rstrip("\r\n")
+    
+    if existing_header and existing_header != header_line:
+        with open(path, newline='') as f:
+            f.readline()
+            rows = f.read()
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', newline='') as f:
+            f.write(header_line + "\r\n" + rows)
+        os.replace(tmp_path, path)
+    
+    with open(path, 'a', newline='') as f:
+        writer = csv.writer(f)
+        if not existing_header:
+            writer.writerow(header)
+        writer.writerow(row)
+
+
+def record_metrics(symbol, spread, dws, depth_25, depth_50, slippage=None):
+    """
+    Append a market's metrics for this cycle to today's metrics file.
+    
+    Args:
+        symbol: Trading pair symbol
+        spread: Current spread percentage
+        dws: Dollar-weighted spread percentage, or None
+        depth_25: Depth at 25% above spread, or None
+        depth_50: Depth at 50% above spread, or None
+        slippage: Dict of SLIPPAGE_METRICS name -> slippage percentage
+    """
+    if not LOG_ENABLED:
+        return
+    
+    slippage = slippage or {}
+    append_csv_row(
+        get_metrics_filepath(),
+        METRICS_COLUMNS,
+        [round(time.time(), 3), symbol, spread, dws, depth_25, depth_50]
+        + [slippage.get(metric) for metric in SLIPPAGE_METRICS]
+    )
+
+
+def record_cycle_stats(cycle_number, duration, scrape_times, scrape_failures,
+                       circuit_skipped, prescreen_skipped):
+    """
+    Append one cycle's timing summary to today's cycle stats file.
+    
+    Args:
+        cycle_number: Cycle number
+        duration: Cycle wall time in seconds (excluding the pause between cycles)
+        scrape_times: Seconds spent scraping each page load in the cycle
+        scrape_failures: Number of page loads that failed
+        circuit_skipped: Number of markets skipped by an open circuit
+        prescreen_skipped: Number of markets the ticker pre-screen left unscraped
+    """
+    if not LOG_ENABLED:
+        return
+    
+    stats_file = os.path.join(os.path.dirname(get_metrics_filepath()),
+                              f"cycles_{datetime.now().strftime('%Y-%m-%d')}.csv")
+    scrape_times = np.asarray(scrape_times, dtype=np.float64)
+    
+    append_csv_row(
+        stats_file,
+        ['timestamp', 'cycle', 'duration_s', 'page_loads', 'scrape_failures',
+         'markets_skipped', 'scrape_mean_s', 'scrape_p95_s', 'circuit_skipped', 'prescreen_skipped'],
+        [
+            round(time.time(), 3), cycle_number, round(duration, 3), len(scrape_times),
+            scrape_failures, circuit_skipped + prescreen_skipped,
+            round(float(scrape_times.mean()), 3) if len(scrape_times) else None,
+            round(float(np.percentile(scrape_times, 95)), 3) if len(scrape_times) else None,
+            circuit_skipped, prescreen_skipped
+        ]
+    )
+
+
+def build_metric_pyramid(metrics_df):
+    """
+    Build min/max/sum/count aggregates of every metric at each history resolution.
+    
+    Each level is aggregated from the previous, finer level, so the raw rows
+    are only grouped once.
+    
+    Args:
+        metrics_df: DataFrame with timestamp (epoch seconds), symbol and metric columns
+        
+    Returns:
+        Dict of resolution seconds -> DataFrame indexed by (symbol, timestamp)
+    """
+    source = pd.DataFrame({'symbol': metrics_df['symbol'], 'timestamp': metrics_df['timestamp']})
+    aggregations = {}
+    for metric in HISTORY_METRICS:
+        # Files written before a metric existed have no values for it
+        if metric in metrics_df:
+            values = pd.to_numeric(metrics_df[metric], errors='coerce')
+        else:
+            values = pd.Series(np.nan, index=metrics_df.index)
+        source[f'{metric}_min'] = values
+        source[f'{metric}_max'] = values
+        source[f'{metric}_sum'] = values
+        source[f'{metric}_count'] = values.notna().astype(np.int64)
+        aggregations.update({
+            f'{metric}_min': 'min', f'{metric}_max': 'max',
+            f'{metric}_sum': 'sum', f'{metric}_count': 'sum'
+        })
+    
+    levels = {}
+    for _, resolution in HISTORY_RESOLUTIONS:
+        source = source.assign(timestamp=(source['timestamp'] // resolution) * resolution)
+        level = source.groupby(['symbol', 'timestamp'], sort=True).agg(aggregations)
+        levels[resolution] = level
+        source = level.reset_index()
+    
+    return levels
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def load_metric_pyramid(path, mtime):
+    """Load a metrics file and build its pyramid (cached until the file changes)."""
+    # Read by position so rows from an older, shorter schema still line up
+    metrics_df = pd.read_csv(path, header=None, skiprows=1, names=METRICS_COLUMNS)
+    metrics_df['timestamp'] = pd.to_numeric(metrics_df['timestamp'], errors='coerce')
+    return build_metric_pyramid(metrics_df.dropna(subset=['timestamp']))
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Pick the indices of n_out points that preserve the shape of a series
+    (Largest-Triangle-Three-Buckets).
+    
+    Args:
+        x: Sorted x values (numpy array)
+        y: y values (numpy array, no NaN)
+        n_out: Number of points to keep
+        
+    Returns:
+        Array of selected indices, always including the first and last point
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        
+        # Triangle area between the previous pick, each candidate and the next bucket's average
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    
+    return selected
+
+
+def get_metric_history(symbol, metric, start_ts, end_ts):
+    """
+    Get a downsampled min/mean/max series of one market metric for a time range.
+    
+    Uses the finest pyramid level with at most HISTORY_MAX_BUCKETS buckets in
+    the range, then LTTB-downsamples it to HISTORY_CHART_POINTS.
+    
+    Args:
+        symbol: Trading pair symbol
+        metric: One of HISTORY_METRICS
+        start_ts: Range start in epoch seconds
+        end_ts: Range end in epoch seconds
+        
+    Returns:
+        Tuple of (DataFrame with time, min, mean, max columns, resolution label)
+    """
+    label, resolution = next(
+        ((label, res) for label, res in HISTORY_RESOLUTIONS
+         if (end_ts - start_ts) / res <= HISTORY_MAX_BUCKETS),
+        HISTORY_RESOLUTIONS[-1]
+    )
+    
+    # Collect this symbol's buckets from every daily file overlapping the range
+    frames = []
+    day = datetime.fromtimestamp(start_ts).date()
+    while day <= datetime.fromtimestamp(end_ts).date():
+        path = os.path.join(METRICS_DIRECTORY, f"metrics_{day.isoformat()}.csv")
+        if os.path.exists(path):
+            try:
+                level = load_metric_pyramid(path, os.path.getmtime(path))[resolution]
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Skipping unreadable metrics file {path}: {e}")
+                level = None
+            if level is not None and symbol in level.index.get_level_values('symbol'):
+                frames.append(level.loc[symbol])
+        day += timedelta(days=1)
+    
+    empty = pd.DataFrame(columns=['time', 'min', 'mean', 'max'])
+    if not frames:
+        return empty, label
+    
+    buckets = pd.concat(frames)
+    buckets = buckets[(buckets.index >= start_ts - resolution) & (buckets.index <= end_ts)]
+    buckets = buckets[buckets[f'{metric}_count'] > 0]
+    if buckets.empty:
+        return empty, label
+    
+    x = buckets.index.to_numpy(dtype=np.float64)
+    mean = (buckets[f'{metric}_sum'] / buckets[f'{metric}_count']).to_numpy()
+    keep = lttb_indices(x, mean, HISTORY_CHART_POINTS)
+    
+    history = pd.DataFrame({
+        'time': [datetime.fromtimestamp(ts) for ts in x[keep]],
+        'min': buckets[f'{metric}_min'].to_numpy()[keep],
+        'mean': mean[keep],
+        'max': buckets[f'{metric}_max'].to_numpy()[keep]
+    })
+    return history, label
+
+
 # --- Telegram Functions ---
 def send_telegram_message(message):
     """
@@ -397,12 +848,518 @@ Ready to monitor orderbook health! 🚀
     return send_telegram_message(message)
 
 
+# --- Pre-screen Functions ---
+def fetch_tickers():
+    """
+    Fetch best bid and ask for every market with a single ticker request.
+    
+    Returns:
+        DataFrame indexed by market id (e.g. 'btcusdt') with bid and ask
+        columns, or None if the request failed
+    """
+    try:
+        response = requests.get(PRESCREEN_TICKER_URL, timeout=10)
+        response.raise_for_status()
+        markets = response.json()['data']
+        return pd.DataFrame.from_dict({
+            market_id: {
+                'bid': pd.to_numeric(market['ticker'].get('buy'), errors='coerce'),
+                'ask': pd.to_numeric(market['ticker'].get('sell'), errors='coerce')
+            }
+            for market_id, market in markets.items()
+        }, orient='index', columns=['bid', 'ask'])
+    except Exception as e:
+        print(f"⚠️ Ticker pre-screen unavailable, scraping all markets: {e}")
+        return None
+
+
+def init_prescreen_state(symbols):
+    """
+    Create columnar pre-screen state holding each market's top of book at its last deep scrape.
+    
+    Args:
+        symbols: List of trading pair symbols
+        
+    Returns:
+        Dict of state arrays indexed like symbols
+    """
+    n = len(symbols)
+    return {
+        'market_ids': [symbol.replace('_', '').lower() for symbol in symbols],
+        'last_deep_cycle': np.full(n, -1, dtype=np.int64),
+        'last_spread': np.full(n, np.nan),
+        'last_mid': np.full(n, np.nan)
+    }
+
+
+def prescreen_markets(state, targets, tickers, previous_ok, cycle_number):
+    """
+    Decide which markets need a full orderbook scrape this cycle from top-of-book data.
+    
+    A market is deep-scraped when it was not Okay last cycle, has no usable
+    ticker, looks unhealthy against its target, moved materially since its
+    last deep scrape, or has gone PRESCREEN_MAX_SKIP_CYCLES without one.
+    
+    Args:
+        state: Pre-screen state from init_prescreen_state (updated in place)
+        targets: Target spread percentage per market (numpy array)
+        tickers: DataFrame from fetch_tickers
+        previous_ok: Whether each market's status is currently Okay (numpy array)
+        cycle_number: Current cycle number
+        
+    Returns:
+        Boolean numpy array, True for markets to deep-scrape
+    """
+    top = tickers.reindex(state['market_ids'])
+    bid = top['bid'].to_numpy(dtype=np.float64)
+    ask = top['ask'].to_numpy(dtype=np.float64)
+    
+    mid = (bid + ask) / 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spread = (ask - bid) / mid * 100
+        percent_diff = (spread - targets) / targets * 100
+        mid_change = np.abs(mid - state['last_mid']) / state['last_mid'] * 100
+    
+    valid = np.isfinite(spread) & (bid > 0) & (ask >= bid)
+    
+    # Same poor-spread rule as the full scrape
+    unhealthy = (percent_diff > 100) | (percent_diff < -40)
+    
+    moved = (
+        (np.abs(spread - state['last_spread']) > targets * PRESCREEN_SPREAD_CHANGE)
+        | (mid_change > PRESCREEN_MID_CHANGE_PCT)
+    )
+    overdue = (state['last_deep_cycle'] < 0) | (cycle_number - state['last_deep_cycle'] >= PRESCREEN_MAX_SKIP_CYCLES)
+    
+    deep = ~valid | ~previous_ok | unhealthy | moved | overdue
+    
+    state['last_deep_cycle'][deep] = cycle_number
+    state['last_spread'][deep] = spread[deep]
+    state['last_mid'][deep] = mid[deep]
+    
+    return deep
+
+
+# --- Circuit Breaker Functions ---
+def init_circuit_breaker():
+    """Create the circuit breaker state for a single market."""
+    return {
+        'state': 'closed',             # closed, open or half_open
+        'consecutive_failures': 0,
+        'open_count': 0,               # Consecutive times opened without recovering
+        'open_until_cycle': None,
+        'latencies': [],
+        'timeout_floor': None          # Widened timeout after a load timed out
+    }
+
+
+def circuit_allows_request(breaker, cycle_number):
+    """
+    Check whether a market may be scraped in this cycle.
+    
+    An open circuit whose backoff has elapsed moves to half-open and is
+    allowed a single probe.
+    
+    Args:
+        breaker: Circuit breaker state for the market
+        cycle_number: Current cycle number
+        
+    Returns:
+        True if the market should be scraped, False if it should be skipped
+    """
+    if breaker['state'] == 'open':
+        if cycle_number < breaker['open_until_cycle']:
+            return False
+        breaker['state'] = 'half_open'
+    return True
+
+
+def record_scrape_success(breaker, latency):
+    """
+    Record a successful scrape, closing the circuit and storing the load latency.
+    
+    Args:
+        breaker: Circuit breaker state for the market
+        latency: Seconds spent waiting for the orderbook to load
+        
+    Returns:
+        True if the circuit was recovering (half-open) and is now closed
+    """
+    recovered = breaker['state'] == 'half_open'
+    
+    breaker['state'] = 'closed'
+    breaker['consecutive_failures'] = 0
+    breaker['open_count'] = 0
+    breaker['open_until_cycle'] = None
+    breaker['timeout_floor'] = None
+    
+    breaker['latencies'].append(latency)
+    if len(breaker['latencies']) > LATENCY_SAMPLE_WINDOW:
+        del breaker['latencies'][:-LATENCY_SAMPLE_WINDOW]
+    
+    return recovered
+
+
+def record_scrape_failure(breaker, cycle_number, timeout=None):
+    """
+    Record a failed scrape and open the circuit when appropriate.
+    
+    A failed half-open probe re-opens the circuit immediately. Each time the
+    circuit opens without recovering, the backoff doubles up to
+    CIRCUIT_MAX_BACKOFF_CYCLES.
+    
+    When the load timed out, the expired timeout is kept as a censored
+    latency sample (the real latency was at least that long) and the next
+    attempt waits twice as long, so a market that slowed down widens its
+    timeout instead of timing out forever.
+    
+    Args:
+        breaker: Circuit breaker state for the market
+        cycle_number: Current cycle number
+        timeout: Wait timeout that expired, if the failure was a load timeout
+        
+    Returns:
+        True if the circuit opened as a result of this failure
+    """
+    breaker['consecutive_failures'] += 1
+    
+    if timeout is not None:
+        breaker['latencies'].append(timeout)
+        if len(breaker['latencies']) > LATENCY_SAMPLE_WINDOW:
+            del breaker['latencies'][:-LATENCY_SAMPLE_WINDOW]
+        breaker['timeout_floor'] = min(timeout * 2, WAIT_TIMEOUT_MAX)
+    
+    if breaker['state'] == 'half_open' or breaker['consecutive_failures'] >= CIRCUIT_FAILURE_THRESHOLD:
+        breaker['open_count'] += 1
+        backoff = min(
+            CIRCUIT_BASE_BACKOFF_CYCLES * 2 ** (breaker['open_count'] - 1),
+            CIRCUIT_MAX_BACKOFF_CYCLES
+        )
+        breaker['state'] = 'open'
+        breaker['open_until_cycle'] = cycle_number + 1 + backoff
+        return True
+    
+    return False
+
+
+def get_adaptive_timeout(breaker):
+    """
+    Get the orderbook wait timeout for a market from its observed load latencies.
+    
+    Half-open probes always get WAIT_TIMEOUT_MAX so a market that recovered
+    more slowly than its old latencies can still close its circuit.
+    
+    Args:
+        breaker: Circuit breaker state for the market
+        
+    Returns:
+        Timeout in seconds
+    """
+    if breaker['state'] == 'half_open':
+        return WAIT_TIMEOUT_MAX
+    
+    if len(breaker['latencies']) < LATENCY_MIN_SAMPLES:
+        timeout = WAIT_TIMEOUT_DEFAULT
+    else:
+        learned = np.percentile(breaker['latencies'], WAIT_TIMEOUT_PERCENTILE) * WAIT_TIMEOUT_MULTIPLIER
+        timeout = float(min(max(learned, WAIT_TIMEOUT_MIN), WAIT_TIMEOUT_MAX))
+    
+    if breaker['timeout_floor'] is not None:
+        timeout = max(timeout, breaker['timeout_floor'])
+    return timeout
+
+
+# --- Health State Functions ---
+def dispatch_health_events(state, cycle_number, symbols):
+    """
+    Evaluate markets whose status for this cycle is final and immediately
+    send their alerts and write their log events.
+    
+    Args:
+        state: Health state from init_health_state (updated in place)
+        cycle_number: Current cycle number
+        symbols: Markets that finished processing for this cycle
+    """
+    if not symbols:
+        return
+    
+    events, alerts = evaluate_health_transitions(state, cycle_number, symbols=symbols)
+    
+    if TELEGRAM_ENABLED:
+        for alert in alerts:
+            if send_warning_alert(**alert):
+                mark_alert_sent(state, alert['symbol'])
+    
+    log_events(events)
+
+
+# --- Memory Profiling Functions ---
+def get_memory_dump_filepath():
+    """Get the memory profile dump file path for today's date."""
+    today = datetime.now().strftime("%Y-%m-%d")
+    os.makedirs(LOG_DIRECTORY, exist_ok=True)
+    return os.path.join(LOG_DIRECTORY, f"memory_profile_{today}.txt")
+
+
+def read_process_rss(pid):
+    """
+    Read the resident set size of a process from /proc.
+    
+    Args:
+        pid: Process id
+        
+    Returns:
+        RSS in bytes, or None if unavailable
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def get_child_pids(pid):
+    """Get all descendant process ids of a process from /proc."""
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children.extend(int(c) for c in f.read().split())
+    except (OSError, ValueError):
+        return []
+    
+    descendants = list(children)
+    for child in children:
+        descendants.extend(get_child_pids(child))
+    return descendants
+
+
+def get_chrome_rss(driver):
+    """
+    Get the combined RSS of chromedriver and every Chrome process it spawned.
+    
+    Args:
+        driver: WebDriver instance
+        
+    Returns:
+        RSS in bytes, or None if unavailable (e.g. no /proc on this platform)
+    """
+    try:
+        root_pid = driver.service.process.pid
+    except AttributeError:
+        return None
+    
+    samples = [read_process_rss(pid) for pid in [root_pid] + get_child_pids(root_pid)]
+    samples = [rss for rss in samples if rss is not None]
+    return sum(samples) if samples else None
+
+
+def start_memory_profiling():
+    """Start tracemalloc and return empty profiling state."""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(MEMORY_TRACE_FRAMES)
+    return {'snapshot': None, 'cycle': None, 'python_traced': None, 'chrome_rss': None,
+            'history': [], 'started': started}
+
+
+def stop_memory_profiling(profile):
+    """Stop tracemalloc if start_memory_profiling started it and drop the last snapshot."""
+    profile['snapshot'] = None
+    if profile['started'] and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    profile['started'] = False
+
+
+def take_memory_sample(profile, driver, cycle_number):
+    """
+    Snapshot Python allocations and Chrome RSS, diffed against the previous sample.
+    
+    Only the latest snapshot is kept in the profiling state so the profiler
+    itself does not grow with uptime.
+    
+    Args:
+        profile: Profiling state from start_memory_profiling (updated in place)
+        driver: WebDriver instance
+        cycle_number: Current cycle number
+        
+    Returns:
+        Report dict with totals, per-cycle deltas and top growing allocation sites
+    """
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<unknown>")
+    ])
+    python_traced = sum(stat.size for stat in snapshot.statistics('filename'))
+    chrome_rss = get_chrome_rss(driver)
+    process_rss = read_process_rss(os.getpid())
+    
+    report = {
+        'cycle': cycle_number,
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'python_traced_mb': python_traced / 1024 ** 2,
+        'process_rss_mb': process_rss / 1024 ** 2 if process_rss is not None else None,
+        'chrome_rss_mb': chrome_rss / 1024 ** 2 if chrome_rss is not None else None,
+        'python_delta_mb_per_cycle': None,
+        'chrome_delta_mb_per_cycle': None,
+        'top_growth': []
+    }
+    
+    previous = profile['snapshot']
+    if previous is not None:
+        cycles_elapsed = max(cycle_number - profile['cycle'], 1)
+        report['python_delta_mb_per_cycle'] = (python_traced - profile['python_traced']) / 1024 ** 2 / cycles_elapsed
+        
+        if chrome_rss is not None and profile['chrome_rss'] is not None:
+            report['chrome_delta_mb_per_cycle'] = (chrome_rss - profile['chrome_rss']) / 1024 ** 2 / cycles_elapsed
+        
+        growth = [stat for stat in snapshot.compare_to(previous, 'lineno') if stat.size_diff > 0]
+        report['top_growth'] = [
+            {
+                'site': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                'growth_kb': round(stat.size_diff / 1024, 1),
+                'new_blocks': stat.count_diff,
+                'total_kb': round(stat.size / 1024, 1)
+            }
+            for stat in growth[:MEMORY_TOP_SITES]
+        ]
+    
+    profile['snapshot'] = snapshot
+    profile['cycle'] = cycle_number
+    profile['python_traced'] = python_traced
+    profile['chrome_rss'] = chrome_rss
+    profile['history'].append({
+        'cycle': cycle_number,
+        'python_traced_mb': report['python_traced_mb'],
+        'process_rss_mb': report['process_rss_mb'],
+        'chrome_rss_mb': report['chrome_rss_mb']
+    })
+    del profile['history'][:-MEMORY_HISTORY_LENGTH]
+    
+    return report
+
+
+def write_memory_report(report):
+    """Append a memory report to today's dump file."""
+    def fmt(value, suffix=" MB"):
+        return f"{value:+.3f}{suffix}" if value is not None else "--"
+    
+    lines = [
+        f"=== {report['timestamp']} | Cycle {report['cycle']} ===",
+        f"Python traced: {report['python_traced_mb']:.2f} MB ({fmt(report['python_delta_mb_per_cycle'], ' MB/cycle')})",
+        f"Process RSS: {report['process_rss_mb']:.2f} MB" if report['process_rss_mb'] is not None else "Process RSS: --",
+        f"Chrome RSS: {report['chrome_rss_mb']:.2f} MB ({fmt(report['chrome_delta_mb_per_cycle'], ' MB/cycle')})"
+        if report['chrome_rss_mb'] is not None else "Chrome RSS: --",
+        "Top growing allocation sites:"
+    ]
+    lines += [
+        f"  {site['growth_kb']:+10.1f} KB  {site['new_blocks']:+7d} blocks  {site['site']}"
+        for site in report['top_growth']
+    ] or ["  (first sample, no diff yet)"]
+    
+    with open(get_memory_dump_filepath(), 'a') as f:
+        f.write("\n".join(lines) + "\n\n")
+
+
+def get_directory_size(path):
+    """Get the total size in bytes of all files under a directory."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+
+def chrome_profile_in_use():
+    """
+    Check whether a live Chrome on this host holds the profile's SingletonLock.
+    
+    Chrome points the lock symlink at "<hostname>-<pid>". A lock from another
+    host (e.g. before a container restart) or from a dead process is stale.
+    """
+    try:
+        target = os.readlink(os.path.join(CHROME_PROFILE_DIRECTORY, "SingletonLock"))
+    except OSError:
+        return False
+    
+    host, _, pid = target.rpartition("-")
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def release_chrome_profile(profile_lock):
+    """Release the profile lock taken by prepare_chrome_profile."""
+    if profile_lock is not None:
+        profile_lock.close()
+
+
+def prepare_chrome_profile():
+    """
+    Lock the persistent Chrome profile for this run and prepare it for launch.
+    
+    Every Streamlit session can start scraping, so the profile is guarded by
+    an exclusive lock held until the run stops (where fcntl is available;
+    elsewhere only the Chrome singleton check below applies). Singleton locks left by a
+    crashed Chrome (they stop Chrome from reusing the profile) are removed
+    only when their process is gone, and the HTTP disk cache is cleared if it
+    has grown past CHROME_CACHE_MAX_BYTES.
+    
+    Returns:
+        Tuple of (disk cache directory, profile lock), or None if another run
+        is using the profile
+    """
+    cache_dir = os.path.join(CHROME_PROFILE_DIRECTORY, "cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    
+    profile_lock = open(os.path.join(CHROME_PROFILE_DIRECTORY, "monitor.lock"), "w")
+    if fcntl is not None:
+        try:
+            fcntl.flock(profile_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            profile_lock.close()
+            return None
+    
+    if chrome_profile_in_use():
+        release_chrome_profile(profile_lock)
+        return None
+    
+    for name in ("SingletonLock", "SingletonSocket", "SingletonCookie"):
+        lock_path = os.path.join(CHROME_PROFILE_DIRECTORY, name)
+        if os.path.lexists(lock_path):
+            os.remove(lock_path)
+    
+    if get_directory_size(cache_dir) > CHROME_CACHE_MAX_BYTES:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    return cache_dir, profile_lock
+
+
 def init_chrome_driver():
     """
     Initialize Chrome WebDriver with appropriate options for headless operation.
     
+    With CHROME_PROFILE_ENABLED, Chrome runs with a persistent user-data
+    directory and capped HTTP disk cache, so restarts reuse cached bundles.
+    If another run holds the profile, Chrome starts without it.
+    
     Returns:
-        WebDriver instance
+        Tuple of (WebDriver instance, profile lock or None); pass the lock to
+        release_chrome_profile after quitting the driver
     """
     chrome_options = Options()
     chrome_options.add_argument("--headless=new")
@@ -417,6 +1374,18 @@ def init_chrome_driver():
     user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
     chrome_options.add_argument(f"user-agent={user_agent}")
     
+    # Persistent profile and HTTP cache
+    profile_lock = None
+    if CHROME_PROFILE_ENABLED:
+        profile = prepare_chrome_profile()
+        if profile is None:
+            print("⚠️ Chrome profile is in use by another run, starting without it")
+        else:
+            cache_dir, profile_lock = profile
+            chrome_options.add_argument(f"--user-data-dir={CHROME_PROFILE_DIRECTORY}")
+            chrome_options.add_argument(f"--disk-cache-dir={cache_dir}")
+            chrome_options.add_argument(f"--disk-cache-size={CHROME_CACHE_MAX_BYTES}")
+    
     # Path fix for Streamlit Cloud
     if os.path.exists("/usr/bin/chromium-browser"):
         chrome_options.binary_location = "/usr/bin/chromium-browser"
@@ -427,9 +1396,73 @@ def init_chrome_driver():
         service = Service("/usr/bin/chromedriver")
         driver = webdriver.Chrome(service=service, options=chrome_options)
     except Exception:
-        driver = webdriver.Chrome(options=chrome_options)
+        try:
+            driver = webdriver.Chrome(options=chrome_options)
+        except Exception:
+            release_chrome_profile(profile_lock)
+            raise
     
-    return driver
+    return driver, profile_lock
+
+
+def warm_up_driver(driver, url, launch_seconds, profile_enabled):
+    """
+    Load a trade page once so the SPA bundles are cached before the first cycle,
+    and record startup time and bytes fetched.
+    
+    Args:
+        driver: WebDriver instance
+        url: Trade page to preload
+        launch_seconds: Seconds spent starting the browser
+        profile_enabled: Whether Chrome runs with the persistent profile
+        
+    Returns:
+        Tuple of (startup stats dict, previous startup's stats dict or None)
+    """
+    preload_start = time.monotonic()
+    try:
+        driver.get(url)
+        WebDriverWait(driver, WAIT_TIMEOUT_DEFAULT).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, ".newTrade-depth-block.depath-index-container"))
+        )
+    except Exception as e:
+        print(f"⚠️ Trade page preload failed: {e}")
+    preload_seconds = time.monotonic() - preload_start
+    
+    # transferSize is 0 for resources served from the disk cache
+    try:
+        resources = driver.execute_script(
+            "return performance.getEntriesByType('navigation')"
+            ".concat(performance.getEntriesByType('resource'))"
+            ".map(e => [e.transferSize || 0, e.decodedBodySize || 0]);"
+        )
+    except Exception:
+        resources = []
+    
+    stats = {
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'profile_enabled': profile_enabled,
+        'launch_s': round(launch_seconds, 2),
+        'preload_s': round(preload_seconds, 2),
+        'bytes_fetched': sum(transfer for transfer, _ in resources),
+        'resources': len(resources),
+        'cached_resources': sum(1 for transfer, decoded in resources if transfer == 0 and decoded > 0)
+    }
+    
+    if not LOG_ENABLED:
+        return stats, None
+    
+    # Keep every startup so cold and warm starts can be compared
+    stats_file = os.path.join(os.path.dirname(get_metrics_filepath()), "startup_stats.csv")
+    previous = None
+    if os.path.exists(stats_file):
+        with open(stats_file, newline='') as f:
+            rows = list(csv.DictReader(f))
+            previous = rows[-1] if rows else None
+    
+    append_csv_row(stats_file, list(stats), list(stats.values()))
+    
+    return stats, previous
 
 
 # --- Streamlit UI Setup ---
@@ -460,10 +1493,15 @@ PAIRS = [
     ['USDC_NGN', 0.50]
 ]
 
+# Optional override of the pairs list from a "symbol,target" CSV (e.g. for load tests)
+if os.getenv('MONITOR_PAIRS_FILE'):
+    with open(os.getenv('MONITOR_PAIRS_FILE'), newline='') as f:
+        PAIRS = [[row[0], float(row[1])] for row in csv.reader(f) if row]
+
 # Constants
 MAX_WARNING_RETRIES = 3
-MAX_FAIL_RETRIES = 3
-BASE_URL = "https://pro.quidax.io/en_US/trade/"
+MAX_FAIL_RETRIES = CIRCUIT_FAILURE_THRESHOLD - 1  # Failures retry in-cycle until the circuit opens
+BASE_URL = os.getenv('MONITOR_BASE_URL', "https://pro.quidax.io/en_US/trade/")
 
 # Initialize results map with persistent tracking (NOW WITH DEPTH FIELDS)
 if 'results_map' not in st.session_state:
@@ -477,6 +1515,10 @@ if 'results_map' not in st.session_state:
             "DWS": None,                               # NEW
             "Depth @ 25% above spread": None,
             "Depth @ 50% above spread": None,
+            **{
+                f"{side} Slippage @ ${int(notional / 1000)}K": None
+                for notional in SLIPPAGE_NOTIONALS for side in ('Buy', 'Sell')
+            },
             "Status": "Pending...",
             "Last Updated": "-",
             "warn_count": 0,
@@ -486,21 +1528,32 @@ if 'results_map' not in st.session_state:
 
 results_map = st.session_state.results_map
 
-# Initialize health tracking for logging and alerts
-if 'health_tracking' not in st.session_state:
-    st.session_state.health_tracking = {
-        p[0]: {
-            'current_status': 'Pending',
-            'previous_status': 'Pending',
-            'warning_start_time': None,
-            'warning_start_cycle': None,
-            'consecutive_warning_cycles': 0,
-            'last_alert_sent_time': None,
-            'last_logged_time': None
-        } for p in PAIRS
-    }
+# Guards results_map rows shared by the pipeline stages
+results_lock = threading.RLock()
+
+# Initialize columnar health tracking for logging and alerts
+if 'health_state' not in st.session_state:
+    st.session_state.health_state = init_health_state([p[0] for p in PAIRS])
+
+health_state = st.session_state.health_state
+
+# Initialize circuit breakers for failing markets
+if 'circuit_breakers' not in st.session_state:
+    st.session_state.circuit_breakers = {p[0]: init_circuit_breaker() for p in PAIRS}
 
-health_tracking = st.session_state.health_tracking
+circuit_breakers = st.session_state.circuit_breakers
+
+# Initialize top-of-book pre-screen state
+if 'prescreen_state' not in st.session_state:
+    st.session_state.prescreen_state = init_prescreen_state([p[0] for p in PAIRS])
+
+prescreen_state = st.session_state.prescreen_state
+
+# Quote units per USD for slippage sizes, learned from SLIPPAGE_USD_RATE_PAIRS
+if 'usd_rates' not in st.session_state:
+    st.session_state.usd_rates = {}
+
+usd_rates = st.session_state.usd_rates
 
 # Initialize log file
 init_log_file()
@@ -509,13 +1562,19 @@ init_log_file()
 status_text = st.empty()
 table_placeholder = st.empty()
 
+# Memory diagnostics panel (opt-in)
+if MEMORY_PROFILING_ENABLED:
+    with st.expander("🧠 Memory Diagnostics", expanded=False):
+        memory_placeholder = st.empty()
+
 
 def render_table():
     """Render the results table with color-coded status highlighting"""
-    df_display = pd.DataFrame([
-        {k: v for k, v in item.items() if k not in ['warn_count', 'fail_count']}
-        for item in results_map.values()
-    ])
+    with results_lock:
+        df_display = pd.DataFrame([
+            {k: v for k, v in item.items() if k not in ['warn_count', 'fail_count']}
+            for item in results_map.values()
+        ])
     
     def highlight_rows(row):
         """Apply background color based on status"""
@@ -537,6 +1596,350 @@ def render_table():
     )
 
 
+def render_memory_panel(report, history):
+    """Render the latest memory report and memory history in the diagnostics panel"""
+    def fmt_delta(value):
+        return f"{value:+.3f} MB/cycle" if value is not None else None
+    
+    with memory_placeholder.container():
+        col_py, col_proc, col_chrome = st.columns(3)
+        col_py.metric("Python traced", f"{report['python_traced_mb']:.1f} MB",
+                      fmt_delta(report['python_delta_mb_per_cycle']), delta_color="inverse")
+        col_proc.metric("Process RSS", f"{report['process_rss_mb']:.1f} MB"
+                        if report['process_rss_mb'] is not None else "--")
+        col_chrome.metric("Chrome RSS", f"{report['chrome_rss_mb']:.1f} MB"
+                          if report['chrome_rss_mb'] is not None else "--",
+                          fmt_delta(report['chrome_delta_mb_per_cycle']), delta_color="inverse")
+        
+        st.line_chart(pd.DataFrame(history).set_index('cycle'))
+        
+        if report['top_growth']:
+            st.caption(f"Top growing allocation sites since previous sample (cycle {report['cycle']})")
+            st.dataframe(pd.DataFrame(report['top_growth']), use_container_width=True)
+
+
+# --- Pipeline Stages ---
+# Scrape (main thread, owns the driver) → process (parse, metrics, archive) →
+# report (log, alert, render). Stages are connected by bounded queues so the
+# driver moves straight on to the next market and blocks only when a
+# downstream stage falls PIPELINE_QUEUE_SIZE snapshots behind.
+def scrape_market(driver, item):
+    """
+    Stage 1: load a market page and capture the raw orderbook text.
+    
+    Args:
+        driver: WebDriver instance
+        item: Tracking queue item for the market
+        
+    Returns:
+        Dict with item, text, latency, timeout and error (the exception, or None)
+    """
+    symbol = item["symbol"]
+    # Wait timeout learned from this market's load latencies
+    timeout = get_adaptive_timeout(circuit_breakers[symbol])
+    scrape = {'item': item, 'text': None, 'latency': None, 'timeout': timeout, 'error': None}
+    
+    try:
+        # Navigate to market page
+        driver.get(BASE_URL + symbol)
+        load_start = time.monotonic()
+        deadline = load_start + timeout
+        
+        # Wait for orderbook element
+        selector = ".newTrade-depth-block.depath-index-container"
+        element = WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+        )
+        
+        # Wait for spread data to load, within the same deadline
+        WebDriverWait(driver, max(deadline - time.monotonic(), 0)).until(
+            lambda d: "Spread" in element.text and any(c.isdigit() for c in element.text)
+        )
+        scrape['latency'] = time.monotonic() - load_start
+        
+        # Small buffer for number stabilization
+        time.sleep(0.5)
+        
+        scrape['text'] = element.text
+    except Exception as e:
+        scrape['error'] = e
+    
+    return scrape
+
+
+def process_scrape_result(scrape, cycle_number, orderbook_archive):
+    """
+    Stage 2: parse a scraped orderbook, compute its metrics and update the market's row.
+    
+    Args:
+        scrape: Result of scrape_market
+        cycle_number: Current cycle number
+        orderbook_archive: Archive state from init_orderbook_archive
+        
+    Returns:
+        Tuple of (requeue, log_entries): whether the market needs another
+        pass this cycle, and log_event keyword argument dicts to write
+    """
+    item = scrape['item']
+    symbol = item["symbol"]
+    target = item["target"]
+    previous_status = item["previous_status"]
+    breaker = circuit_breakers[symbol]
+    log_entries = []
+    
+    try:
+        if scrape['error'] is not None:
+            raise scrape['error']
+        
+        # Parse orderbook data
+        orderbook_text = scrape['text']
+        asks_df, bids_df, spread_df = parse_orderbook(orderbook_text)
+        
+        # Archive the snapshot (keyframe or level deltas)
+        archive_orderbook(orderbook_archive, symbol, asks_df, bids_df, spread_df)
+        
+        # --- NEW: Calculate Depth Metrics ---
+        depth_1pct = calculate_liquidity_depth(asks_df, bids_df, spread_df['spread_percent'][0]*(1.25))
+        depth_2pct = calculate_liquidity_depth(asks_df, bids_df, spread_df['spread_percent'][0]*(1.5))
+        
+        # Calculate Dollar-Weighted Spread (DWS) for first 10 levels
+        dws_value = calculate_dws(asks_df, bids_df, num_levels=10)
+        dws_display = f"{dws_value:.4f}%" if dws_value is not None else "--"
+        
+        # Format depth for display
+        depth_1pct_display = format_depth_value(depth_1pct)
+        depth_2pct_display = format_depth_value(depth_2pct)
+        
+        # Calculate slippage for fixed USD order sizes, converted to the quote currency
+        for quote, rate_pair in SLIPPAGE_USD_RATE_PAIRS.items():
+            if symbol == rate_pair:
+                usd_rates[quote] = get_mid_price(asks_df, bids_df) or usd_rates.get(quote)
+        quote_notionals = get_quote_notionals(symbol, usd_rates)
+        price_impact = None
+        if quote_notionals is not None:
+            price_impact = calculate_price_impact(asks_df, bids_df, quote_notionals)
+        slippage_metrics, slippage_display = get_slippage_columns(price_impact)
+        
+        if spread_df.empty or spread_df['spread_percent'][0] is None:
+            raise ValueError("Spread data not found in element text")
+        
+        current_val = spread_df['spread_percent'][0]
+        diff = current_val - target
+        percent_diff = (diff / target) * 100
+        
+        # Record metrics for the history charts
+        record_metrics(symbol, current_val, dws_value, depth_1pct, depth_2pct, slippage_metrics)
+        
+        # Scrape succeeded, close the circuit
+        if record_scrape_success(breaker, scrape['latency']):
+            log_entries.append({
+                'symbol': symbol,
+                'event_type': 'CIRCUIT_CLOSED',
+                'notes': "Market recovered after half-open probe"
+            })
+        
+        # Check if spread is poor
+        is_poor_spread = (percent_diff > 100 or percent_diff < -40)
+        
+        # Special handling for markets that were Warning in previous cycle
+        if previous_status == "Warning" and is_poor_spread:
+            # Still poor - keep RED, don't retry
+            with results_lock:
+                results_map[symbol].update({
+                    "Current Spread %": current_val,
+                    "Difference": round(diff, 4),
+                    "Percent Diff %": round(percent_diff, 2),
+                    "DWS": dws_display,  # NEW
+                    "Depth @ 25% above spread": depth_1pct_display,
+                    "Depth @ 50% above spread": depth_2pct_display,
+                    **slippage_display,
+                    "Status": "Warning",
+                    "Last Updated": time.strftime("%H:%M:%S")
+                })
+            return False, log_entries
+        
+        # Normal spread evaluation logic
+        requeue = False
+        if is_poor_spread:
+            if item["warn_count"] < MAX_WARNING_RETRIES:
+                item["warn_count"] += 1
+                requeue = True
+                status = f'Warning (Retry {item["warn_count"]}/{MAX_WARNING_RETRIES})'
+            else:
+                status = 'Warning'
+        else:
+            status = 'Okay'
+        
+        # Update results with DEPTH DATA
+        with results_lock:
+            results_map[symbol].update({
+                "Current Spread %": current_val,
+                "Difference": round(diff, 4),
+                "Percent Diff %": round(percent_diff, 2),
+                "DWS": dws_display,
+                "Depth @ 25% above spread": depth_1pct_display,
+                "Depth @ 50% above spread": depth_2pct_display,
+                **slippage_display,
+                "Status": status,
+                "Last Updated": time.strftime("%H:%M:%S"),
+                "warn_count": item["warn_count"],
+                "fail_count": item["fail_count"]
+            })
+        
+        # Determine final clean status (strip retry counts)
+        clean_status = 'Warning' if 'Warning' in status else ('Okay' if status == 'Okay' else 'Pending')
+        
+        # Store cycle data for health evaluation. Only this market's row is
+        # written, and it is handed to the report stage afterwards.
+        record_cycle_data(
+            health_state, symbol,
+            clean_status=clean_status,
+            current_spread=current_val,
+            target_spread=target,
+            percent_diff=percent_diff,
+            dws_value=dws_value,
+            dws_display=dws_display,
+            depth_1pct=depth_1pct,
+            depth_2pct=depth_2pct,
+            depth_1pct_display=depth_1pct_display,
+            depth_2pct_display=depth_2pct_display,
+            is_poor_spread=is_poor_spread
+        )
+        return requeue, log_entries
+    
+    except Exception as e:
+        # Handle scraping failures
+        item["fail_count"] += 1
+        timed_out = isinstance(e, TimeoutException) and scrape['error'] is e
+        circuit_opened = record_scrape_failure(breaker, cycle_number, scrape['timeout'] if timed_out else None)
+        
+        # Log scrape failure
+        error_msg = f"{type(e).__name__}: {str(e)[:100]}"
+        log_entries.append({
+            'symbol': symbol,
+            'event_type': 'SCRAPE_FAILED',
+            'notes': f"{error_msg} (Failure {item['fail_count']}/{CIRCUIT_FAILURE_THRESHOLD})"
+        })
+        
+        requeue = False
+        if circuit_opened:
+            # Stop retrying this market until its backoff elapses
+            skip_cycles = breaker['open_until_cycle'] - cycle_number - 1
+            log_entries.append({
+                'symbol': symbol,
+                'event_type': 'CIRCUIT_OPENED',
+                'duration_cycles': skip_cycles,
+                'notes': f"{breaker['consecutive_failures']} consecutive failures, skipping {skip_cycles} cycles"
+            })
+            status = f'Circuit Open (retry in {skip_cycles + 1} cycles)'
+        else:
+            # Below the circuit threshold, so at most MAX_FAIL_RETRIES retries this cycle
+            requeue = True
+            status = f'Failed (Retry {item["fail_count"]}/{MAX_FAIL_RETRIES})'
+        
+        with results_lock:
+            results_map[symbol].update({
+                "Status": status,
+                "warn_count": item["warn_count"],
+                "fail_count": item["fail_count"]
+            })
+        return requeue, log_entries
+
+
+def processing_worker(scrape_queue, report_queue, orderbook_archive, pipeline_errors):
+    """Stage 2 thread: process scraped books until a None sentinel arrives."""
+    while True:
+        scrape = scrape_queue.get()
+        try:
+            if scrape is None:
+                report_queue.put(None)
+                return
+            
+            requeue, log_entries = process_scrape_result(scrape, scrape['cycle_number'], orderbook_archive)
+            if requeue:
+                scrape['next_pass_queue'].append(scrape['item'])
+            
+            report_queue.put({
+                'symbol': scrape['item']["symbol"],
+                'cycle_number': scrape['cycle_number'],
+                'requeue': requeue,
+                'log_entries': log_entries
+            })
+        except Exception as e:
+            pipeline_errors.append(e)
+        finally:
+            scrape_queue.task_done()
+
+
+def reporting_worker(report_queue, pipeline_errors):
+    """Stage 3 thread: write logs, evaluate health, send alerts and render the table."""
+    while True:
+        report = report_queue.get()
+        try:
+            if report is None:
+                return
+            
+            log_events(report['log_entries'])
+            
+            # Evaluate health as soon as the market's status for this cycle is final
+            if not report['requeue']:
+                dispatch_health_events(health_state, report['cycle_number'], [report['symbol']])
+            
+            # Update table after each market
+            render_table()
+        except Exception as e:
+            pipeline_errors.append(e)
+        finally:
+            report_queue.task_done()
+
+
+def start_pipeline(orderbook_archive):
+    """
+    Start the processing and reporting stage threads.
+    
+    Returns:
+        Dict with the scrape queue, report queue, threads and collected errors
+    """
+    scrape_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    report_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    pipeline_errors = []
+    
+    threads = [
+        threading.Thread(target=processing_worker, daemon=True,
+                         args=(scrape_queue, report_queue, orderbook_archive, pipeline_errors)),
+        threading.Thread(target=reporting_worker, daemon=True,
+                         args=(report_queue, pipeline_errors))
+    ]
+    for thread in threads:
+        add_script_run_ctx(thread)
+        thread.start()
+    
+    return {'scrape_queue': scrape_queue, 'report_queue': report_queue,
+            'threads': threads, 'errors': pipeline_errors}
+
+
+def drain_pipeline(pipeline):
+    """Wait until every queued snapshot has been processed and reported."""
+    pipeline['scrape_queue'].join()
+    pipeline['report_queue'].join()
+    if pipeline['errors']:
+        raise pipeline['errors'][0]
+
+
+def stop_pipeline(pipeline):
+    """
+    Send the stop sentinel through the stages and wait for the threads to exit.
+    
+    Returns:
+        True if every stage thread has exited
+    """
+    if any(thread.is_alive() for thread in pipeline['threads']):
+        pipeline['scrape_queue'].put(None)
+        for thread in pipeline['threads']:
+            thread.join(timeout=30)
+    return not any(thread.is_alive() for thread in pipeline['threads'])
+
+
 # --- Log Viewer Section ---
 st.markdown("---")
 st.subheader("📊 Log Viewer")
@@ -588,6 +1991,47 @@ with col2:
                 mime="text/csv"
             )
 
+# --- Market History Section ---
+st.markdown("---")
+st.subheader("📈 Market History")
+
+HISTORY_RANGES = {'Last hour': 3600, 'Last 6 hours': 6 * 3600, 'Last 24 hours': 24 * 3600, 'Last 7 days': 7 * 24 * 3600}
+HISTORY_METRIC_LABELS = {
+    'spread': 'Spread %', 'dws': 'DWS %',
+    'depth_25': 'Depth @ 25% above spread', 'depth_50': 'Depth @ 50% above spread',
+    **{
+        f"slippage_{side}_{int(notional / 1000)}k": f"{side.title()} Slippage @ ${int(notional / 1000)}K %"
+        for notional in SLIPPAGE_NOTIONALS for side in ('buy', 'sell')
+    }
+}
+
+hist_col1, hist_col2, hist_col3 = st.columns(3)
+history_symbol = hist_col1.selectbox("Market:", options=[p[0] for p in PAIRS])
+history_metric = hist_col2.selectbox("Metric:", options=HISTORY_METRICS,
+                                     format_func=lambda m: HISTORY_METRIC_LABELS[m])
+history_range = hist_col3.selectbox("Range:", options=list(HISTORY_RANGES), index=2)
+
+history_end = time.time()
+history_df, history_resolution = get_metric_history(
+    history_symbol, history_metric, history_end - HISTORY_RANGES[history_range], history_end
+)
+
+if history_df.empty:
+    st.info("No history recorded for this market yet. Metrics are recorded while monitoring.")
+else:
+    band = alt.Chart(history_df).mark_area(opacity=0.25).encode(
+        x=alt.X('time:T', title=None),
+        y=alt.Y('min:Q', title=HISTORY_METRIC_LABELS[history_metric]),
+        y2='max:Q'
+    )
+    line = alt.Chart(history_df).mark_line().encode(
+        x='time:T',
+        y='mean:Q',
+        tooltip=['time:T', 'min:Q', 'mean:Q', 'max:Q']
+    )
+    st.altair_chart((band + line).interactive(), use_container_width=True)
+    st.caption(f"{history_resolution} buckets (min/max band, mean line), {len(history_df)} points shown")
+
 # Main scraping button
 if st.button('Start Scraping', disabled=st.session_state.scraping_active):
     st.session_state.scraping_active = True
@@ -596,32 +2040,94 @@ if st.button('Start Scraping', disabled=st.session_state.scraping_active):
     if TELEGRAM_ENABLED:
         send_startup_message()
     
-    # Initialize driver once for all cycles
-    driver = init_chrome_driver()
-    wait = WebDriverWait(driver, 10)
+    # Initialize driver once for all cycles and preload the trade page
+    launch_start = time.monotonic()
+    driver, profile_lock = init_chrome_driver()
+    startup_stats, previous_startup = warm_up_driver(
+        driver, BASE_URL + PAIRS[0][0], time.monotonic() - launch_start, profile_lock is not None
+    )
+    
+    startup_summary = (
+        f"Browser ready in {startup_stats['launch_s'] + startup_stats['preload_s']:.1f} s, "
+        f"{startup_stats['bytes_fetched'] / 1024:.0f} KB fetched, "
+        f"{startup_stats['cached_resources']}/{startup_stats['resources']} resources from cache"
+    )
+    if previous_startup:
+        startup_summary += (
+            f" (previous start: {float(previous_startup['launch_s']) + float(previous_startup['preload_s']):.1f} s, "
+            f"{int(previous_startup['bytes_fetched']) / 1024:.0f} KB)"
+        )
+    st.caption(startup_summary)
+    
+    # Buffer orderbook snapshots for the archive
+    orderbook_archive = init_orderbook_archive()
+    
+    # Start memory profiling for long runs
+    memory_profile = start_memory_profiling() if MEMORY_PROFILING_ENABLED else None
+    
+    # Start the processing and reporting stages
+    pipeline = start_pipeline(orderbook_archive)
     
     try:
         cycle_number = 1
         
         while True:  # Infinite loop for continuous monitoring
+            cycle_start = time.monotonic()
+            scrape_times = []
+            scrape_failures = 0
+            
             # Initialize tracking queue for this cycle
             tracking_queue = []
+            skipped_symbols = []
+            circuit_skipped = 0
+            
+            # Pre-screen every market from one ticker request, deep-scrape only where needed
+            deep_scrape = np.ones(len(PAIRS), dtype=bool)
+            if PRESCREEN_ENABLED:
+                tickers = fetch_tickers()
+                if tickers is not None:
+                    deep_scrape = prescreen_markets(
+                        prescreen_state,
+                        np.array([p[1] for p in PAIRS], dtype=np.float64),
+                        tickers,
+                        np.array([results_map[p[0]]["Status"] == "Okay" for p in PAIRS]),
+                        cycle_number
+                    )
+                    status_text.text(f"Cycle {cycle_number} | Pre-screen: {int(deep_scrape.sum())} of {len(PAIRS)} markets need a full scrape")
             
-            for p in PAIRS:
+            for i, p in enumerate(PAIRS):
                 symbol = p[0]
                 target = p[1]
                 previous_status = results_map[symbol]["Status"]
                 
-                # Preserve counters from previous cycles
+                # Skip markets whose circuit is open until their backoff elapses
+                breaker = circuit_breakers[symbol]
+                if not circuit_allows_request(breaker, cycle_number):
+                    cycles_left = breaker['open_until_cycle'] - cycle_number
+                    with results_lock:
+                        results_map[symbol]["Status"] = f"Circuit Open (retry in {cycles_left} cycles)"
+                    skipped_symbols.append(symbol)
+                    circuit_skipped += 1
+                    continue
+                
+                # Healthy and unchanged at the top of book, keep last full scrape
+                if not deep_scrape[i]:
+                    skipped_symbols.append(symbol)
+                    continue
+                
+                # Preserve warning counter from previous cycles, failures are per cycle
                 item = {
                     "symbol": symbol,
                     "target": target,
                     "warn_count": results_map[symbol]["warn_count"],
-                    "fail_count": results_map[symbol]["fail_count"],
+                    "fail_count": 0,
                     "previous_status": previous_status
                 }
                 tracking_queue.append(item)
             
+            # Skipped and pre-screened markets are final for this cycle right away
+            dispatch_health_events(health_state, cycle_number, skipped_symbols)
+            
             # Render initial table state for this cycle
             render_table()
             
@@ -632,273 +2138,32 @@ if st.button('Start Scraping', disabled=st.session_state.scraping_active):
                 next_pass_queue = []
                 
                 for item in tracking_queue:
-                    symbol = item["symbol"]
-                    target = item["target"]
-                    previous_status = item["previous_status"]
+                    status_text.text(f"Cycle {cycle_number} | Pass {pass_idx} | Scanning {item['symbol']}...")
                     
-                    status_text.text(f"Cycle {cycle_number} | Pass {pass_idx} | Scanning {symbol}...")
-                    
-                    try:
-                        # Navigate to market page
-                        driver.get(BASE_URL + symbol)
-                        
-                        # Wait for orderbook element
-                        selector = ".newTrade-depth-block.depath-index-container"
-                        element = wait.until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                        )
-                        
-                        # Wait for spread data to load
-                        wait.until(lambda d: "Spread" in element.text and 
-                                  any(c.isdigit() for c in element.text))
-                        
-                        # Small buffer for number stabilization
-                        time.sleep(0.5)
-                        
-                        # Parse orderbook data
-                        asks_df, bids_df, spread_df = parse_orderbook(element.text)
-                        
-                        # --- NEW: Calculate Depth Metrics ---
-                        depth_1pct = calculate_liquidity_depth(asks_df, bids_df, spread_df['spread_percent'][0]*(1.25))
-                        depth_2pct = calculate_liquidity_depth(asks_df, bids_df, spread_df['spread_percent'][0]*(1.5))
-                        
-                        # Calculate Dollar-Weighted Spread (DWS) for first 10 levels
-                        dws_value = calculate_dws(asks_df, bids_df, num_levels=10)
-                        dws_display = f"{dws_value:.4f}%" if dws_value is not None else "--"
-                        
-                        # Format depth for display
-                        depth_1pct_display = format_depth_value(depth_1pct)
-                        depth_2pct_display = format_depth_value(depth_2pct)
-                        
-                        if not spread_df.empty and spread_df['spread_percent'][0] is not None:
-                            current_val = spread_df['spread_percent'][0]
-                            diff = current_val - target
-                            percent_diff = (diff / target) * 100
-                            
-                            # Check if spread is poor
-                            is_poor_spread = (percent_diff > 100 or percent_diff < -40)
-                            
-                            # Special handling for markets that were Warning in previous cycle
-                            if previous_status == "Warning":
-                                if is_poor_spread:
-                                    # Still poor - keep RED, don't retry
-                                    results_map[symbol].update({
-                                        "Current Spread %": current_val,
-                                        "Difference": round(diff, 4),
-                                        "Percent Diff %": round(percent_diff, 2),
-                                        "DWS": dws_display,  # NEW
-                                        "Depth @ 25% above spread": depth_1pct_display,
-                                        "Depth @ 50% above spread": depth_2pct_display,
-                                        "Status": "Warning",
-                                        "Last Updated": time.strftime("%H:%M:%S")
-                                    })
-                                    # Don't add to retry queue
-                                    render_table()
-                                    continue
-                                # else: spread improved, fall through to normal evaluation
-                            
-                            # Normal spread evaluation logic
-                            if is_poor_spread:
-                                if item["warn_count"] < MAX_WARNING_RETRIES:
-                                    item["warn_count"] += 1
-                                    next_pass_queue.append(item)
-                                    status = f'Warning (Retry {item["warn_count"]}/{MAX_WARNING_RETRIES})'
-                                else:
-                                    status = 'Warning'
-                            else:
-                                status = 'Okay'
-                            
-                            # Update results with DEPTH DATA
-                            results_map[symbol].update({
-                                "Current Spread %": current_val,
-                                "Difference": round(diff, 4),
-                                "Percent Diff %": round(percent_diff, 2),
-                                "DWS": dws_display,
-                                "Depth @ 25% above spread": depth_1pct_display,
-                                "Depth @ 50% above spread": depth_2pct_display,
-                                "Status": status,
-                                "Last Updated": time.strftime("%H:%M:%S"),
-                                "warn_count": item["warn_count"],
-                                "fail_count": item["fail_count"]
-                            })
-                            
-                            # Store data for end-of-cycle health tracking
-                            # Determine final clean status (strip retry counts)
-                            clean_status = 'Warning' if 'Warning' in status else ('Okay' if status == 'Okay' else 'Pending')
-                            
-                            # Store cycle data for logging at cycle end
-                            health_tracking[symbol]['cycle_data'] = {
-                                'clean_status': clean_status,
-                                'current_spread': current_val,
-                                'target_spread': target,
-                                'percent_diff': percent_diff,
-                                'dws_value': dws_value,
-                                'dws_display': dws_display,
-                                'depth_1pct': depth_1pct if depth_1pct else 0,
-                                'depth_2pct': depth_2pct if depth_2pct else 0,
-                                'depth_1pct_display': depth_1pct_display,
-                                'depth_2pct_display': depth_2pct_display,
-                                'is_poor_spread': is_poor_spread,
-                                'percent_diff_val': percent_diff
-                            }
-                        else:
-                            raise ValueError("Spread data not found in element text")
-                    
-                    except Exception as e:
-                        # Handle scraping failures
-                        item["fail_count"] += 1
-                        
-                        # Log scrape failure
-                        error_msg = f"{type(e).__name__}: {str(e)[:100]}"
-                        log_event(
-                            symbol=symbol,
-                            event_type='SCRAPE_FAILED',
-                            notes=f"{error_msg} (Retry {item['fail_count']}/{MAX_FAIL_RETRIES})"
-                        )
-                        
-                        if item["fail_count"] <= MAX_FAIL_RETRIES:
-                            next_pass_queue.append(item)
-                            status = f'Failed (Retry {item["fail_count"]}/{MAX_FAIL_RETRIES})'
-                        else:
-                            status = 'Failed Permanently'
-                        
-                        results_map[symbol].update({
-                            "Status": status,
-                            "warn_count": item["warn_count"],
-                            "fail_count": item["fail_count"]
-                        })
-                    
-                    # Update table after each market
-                    render_table()
+                    # Hand the raw book downstream, blocking if processing lags behind
+                    scrape_start = time.monotonic()
+                    scrape = scrape_market(driver, item)
+                    scrape_times.append(time.monotonic() - scrape_start)
+                    scrape_failures += scrape['error'] is not None
+                    scrape.update({'cycle_number': cycle_number, 'next_pass_queue': next_pass_queue})
+                    pipeline['scrape_queue'].put(scrape)
+                
+                # Retries depend on processed results, so finish this pass first
+                drain_pipeline(pipeline)
                 
                 # Move to next pass
                 tracking_queue = next_pass_queue
                 pass_idx += 1
             
-            # --- END OF CYCLE: Process health tracking for all markets ---
-            for p in PAIRS:
-                symbol = p[0]
-                health = health_tracking[symbol]
-                
-                # Skip if no cycle data (market wasn't processed this cycle)
-                if 'cycle_data' not in health:
-                    continue
-                
-                cycle_data = health['cycle_data']
-                clean_status = cycle_data['clean_status']
-                prev_status = health['previous_status']
-                
-                # Determine reason for warning
-                reason = ""
-                if cycle_data['is_poor_spread']:
-                    if cycle_data['percent_diff_val'] > 100:
-                        reason = f"Spread too wide (>{cycle_data['percent_diff_val']:.1f}% above target)"
-                    else:
-                        reason = f"Spread too tight ({cycle_data['percent_diff_val']:.1f}% below target)"
-                
-                # Parse DWS numeric value
-                dws_numeric = None
-                if cycle_data['dws_value'] is not None:
-                    dws_numeric = round(cycle_data['dws_value'], 4)
-                
-                # STATUS CHANGE: Okay/Pending → Warning
-                if clean_status == 'Warning' and prev_status != 'Warning':
-                    # Log WARNING_ENTERED
-                    log_event(
-                        symbol=symbol,
-                        event_type='WARNING_ENTERED',
-                        current_spread=round(cycle_data['current_spread'], 4),
-                        target_spread=cycle_data['target_spread'],
-                        percent_diff=round(cycle_data['percent_diff'], 2),
-                        dws=dws_numeric,
-                        depth_25=cycle_data['depth_1pct'],
-                        depth_50=cycle_data['depth_2pct'],
-                        duration_cycles=1,
-                        notes=reason
-                    )
-                    
-                    # Initialize warning tracking
-                    health['warning_start_time'] = datetime.now()
-                    health['warning_start_cycle'] = cycle_number
-                    health['consecutive_warning_cycles'] = 1
-                
-                # STATUS CHANGE: Warning → Okay
-                elif clean_status == 'Okay' and prev_status == 'Warning':
-                    # Calculate duration
-                    duration_cycles = health['consecutive_warning_cycles']
-                    duration_time = datetime.now() - health['warning_start_time']
-                    duration_minutes = int(duration_time.total_seconds() / 60)
-                    
-                    # Log WARNING_CLEARED
-                    log_event(
-                        symbol=symbol,
-                        event_type='WARNING_CLEARED',
-                        current_spread=round(cycle_data['current_spread'], 4),
-                        target_spread=cycle_data['target_spread'],
-                        percent_diff=round(cycle_data['percent_diff'], 2),
-                        dws=dws_numeric,
-                        depth_25=cycle_data['depth_1pct'],
-                        depth_50=cycle_data['depth_2pct'],
-                        duration_cycles=duration_cycles,
-                        notes=f"Returned to healthy after {duration_cycles} cycles ({duration_minutes} minutes)"
-                    )
-                    
-                    # Reset warning tracking
-                    health['consecutive_warning_cycles'] = 0
-                    health['warning_start_time'] = None
-                    health['warning_start_cycle'] = None
-                    health['last_alert_sent_time'] = None
-                
-                # WARNING PERSISTS
-                elif clean_status == 'Warning' and prev_status == 'Warning':
-                    # Increment consecutive cycles
-                    health['consecutive_warning_cycles'] += 1
-                    cycles = health['consecutive_warning_cycles']
-                    
-                    # Check if we should send Telegram alert
-                    if cycles == ALERT_THRESHOLD_CYCLES:
-                        # Check cooldown
-                        should_alert = True
-                        if health['last_alert_sent_time']:
-                            time_since_alert = datetime.now() - health['last_alert_sent_time']
-                            if time_since_alert < timedelta(minutes=ALERT_COOLDOWN_MINUTES):
-                                should_alert = False
-                        
-                        if should_alert and TELEGRAM_ENABLED:
-                            success = send_warning_alert(
-                                symbol=symbol,
-                                current_spread=cycle_data['current_spread'],
-                                target_spread=cycle_data['target_spread'],
-                                percent_diff=cycle_data['percent_diff'],
-                                dws=cycle_data['dws_display'],
-                                depth_25=cycle_data['depth_1pct_display'],
-                                depth_50=cycle_data['depth_2pct_display'],
-                                consecutive_cycles=cycles,
-                                warning_start_time=health['warning_start_time'],
-                                reason=reason
-                            )
-                            if success:
-                                health['last_alert_sent_time'] = datetime.now()
-                    
-                    # Log WARNING_PERSISTENT every N cycles
-                    if cycles % PERSISTENT_LOG_INTERVAL == 0:
-                        log_event(
-                            symbol=symbol,
-                            event_type='WARNING_PERSISTENT',
-                            current_spread=round(cycle_data['current_spread'], 4),
-                            target_spread=cycle_data['target_spread'],
-                            percent_diff=round(cycle_data['percent_diff'], 2),
-                            dws=dws_numeric,
-                            depth_25=cycle_data['depth_1pct'],
-                            depth_50=cycle_data['depth_2pct'],
-                            duration_cycles=cycles,
-                            notes=f"Still unhealthy after {cycles} cycles"
-                        )
-                
-                # Update previous status for next cycle
-                health['previous_status'] = clean_status
+            # Periodic memory snapshot and leak report
+            if MEMORY_PROFILING_ENABLED and cycle_number % MEMORY_SNAPSHOT_INTERVAL == 0:
+                memory_report = take_memory_sample(memory_profile, driver, cycle_number)
+                write_memory_report(memory_report)
+                render_memory_panel(memory_report, memory_profile['history'])
             
-            # Cycle complete, increment counter and loop continues
+            # Cycle complete, record timing, increment counter and loop continues
+            record_cycle_stats(cycle_number, time.monotonic() - cycle_start, scrape_times,
+                               scrape_failures, circuit_skipped, len(skipped_symbols) - circuit_skipped)
             cycle_number += 1
             status_text.text(f"Cycle {cycle_number - 1} complete. Starting Cycle {cycle_number}...")
             time.sleep(2)  # Brief pause between cycles
@@ -907,6 +2172,12 @@ if st.button('Start Scraping', disabled=st.session_state.scraping_active):
         status_text.error(f"Critical error occurred: {str(e)}")
     
     finally:
+        # The processing stage writes to the archive buffers, only flush once it has exited
+        if stop_pipeline(pipeline):
+            flush_orderbook_archive(orderbook_archive)
+        if memory_profile is not None:
+            stop_memory_profiling(memory_profile)
         driver.quit()
+        release_chrome_profile(profile_lock)
         st.session_state.scraping_active = False
-        status_text.success("Scraping stopped.")
\ No newline at end of file
+        status_text.success("Scraping stopped.")
@@ -0,0 +1,222 @@
+"""
+Warning state machine for the orderbook monitor.
+
+Kept free of Streamlit and Selenium so it can be imported on its own by
+tests/test_health.py, which replays it against the original per-market loop.
+"""
+import time
+from datetime import datetime
+
+import numpy as np
+
+# Alert Thresholds
+ALERT_THRESHOLD_CYCLES = 3        # Alert after 3 consecutive warning cycles
+ALERT_COOLDOWN_MINUTES = 30       # Don't re-alert for 30 minutes
+PERSISTENT_LOG_INTERVAL = 5       # Log WARNING_PERSISTENT every 5 cycles
+
+# Health Status Codes
+HEALTH_PENDING = 0
+HEALTH_OKAY = 1
+HEALTH_WARNING = 2
+HEALTH_STATUS_CODES = {'Pending': HEALTH_PENDING, 'Okay': HEALTH_OKAY, 'Warning': HEALTH_WARNING}
+
+
+def init_health_state(symbols):
+    """
+    Create columnar health tracking state for all markets.
+    
+    Every column is an array indexed by the market's position in symbols.
+    Times are stored as epoch seconds with NaN meaning unset.
+    
+    Args:
+        symbols: List of trading pair symbols
+        
+    Returns:
+        Dict of state arrays
+    """
+    n = len(symbols)
+    return {
+        'symbols': list(symbols),
+        'index': {symbol: i for i, symbol in enumerate(symbols)},
+        # State machine columns
+        'previous_status': np.full(n, HEALTH_PENDING, dtype=np.int8),
+        'consecutive_warning_cycles': np.zeros(n, dtype=np.int64),
+        'warning_start_time': np.full(n, np.nan),
+        'warning_start_cycle': np.full(n, -1, dtype=np.int64),
+        'last_alert_sent_time': np.full(n, np.nan),
+        # Latest scrape result columns
+        'has_data': np.zeros(n, dtype=bool),
+        'clean_status': np.full(n, HEALTH_PENDING, dtype=np.int8),
+        'current_spread': np.full(n, np.nan),
+        'target_spread': np.full(n, np.nan),
+        'percent_diff': np.full(n, np.nan),
+        'dws_value': np.full(n, np.nan),
+        'depth_1pct': np.zeros(n),
+        'depth_2pct': np.zeros(n),
+        'is_poor_spread': np.zeros(n, dtype=bool),
+        'dws_display': np.full(n, "--", dtype=object),
+        'depth_1pct_display': np.full(n, "--", dtype=object),
+        'depth_2pct_display': np.full(n, "--", dtype=object)
+    }
+
+
+def record_cycle_data(state, symbol, clean_status, current_spread, target_spread,
+                      percent_diff, dws_value, dws_display, depth_1pct, depth_2pct,
+                      depth_1pct_display, depth_2pct_display, is_poor_spread):
+    """
+    Store a market's latest scrape result for the end-of-cycle health evaluation.
+    
+    Args:
+        state: Health state from init_health_state
+        symbol: Trading pair symbol
+        clean_status: 'Okay', 'Warning' or 'Pending'
+        current_spread: Current spread percentage
+        target_spread: Target spread percentage
+        percent_diff: Percentage difference from target
+        dws_value: Dollar-weighted spread percentage, or None
+        dws_display: DWS display string
+        depth_1pct: Depth at 25% above spread (numeric value, or None)
+        depth_2pct: Depth at 50% above spread (numeric value, or None)
+        depth_1pct_display: Depth at 25% display string
+        depth_2pct_display: Depth at 50% display string
+        is_poor_spread: Whether the spread is outside the healthy range
+    """
+    i = state['index'][symbol]
+    state['has_data'][i] = True
+    state['clean_status'][i] = HEALTH_STATUS_CODES[clean_status]
+    state['current_spread'][i] = current_spread
+    state['target_spread'][i] = target_spread
+    state['percent_diff'][i] = percent_diff
+    state['dws_value'][i] = dws_value if dws_value is not None else np.nan
+    state['dws_display'][i] = dws_display
+    state['depth_1pct'][i] = depth_1pct if depth_1pct else 0
+    state['depth_2pct'][i] = depth_2pct if depth_2pct else 0
+    state['depth_1pct_display'][i] = depth_1pct_display
+    state['depth_2pct_display'][i] = depth_2pct_display
+    state['is_poor_spread'][i] = is_poor_spread
+
+
+def warning_reason(is_poor_spread, percent_diff):
+    """Describe why a market is unhealthy, or return an empty string."""
+    if not is_poor_spread:
+        return ""
+    if percent_diff > 100:
+        return f"Spread too wide (>{percent_diff:.1f}% above target)"
+    return f"Spread too tight ({percent_diff:.1f}% below target)"
+
+
+def evaluate_health_transitions(state, cycle_number, now=None, symbols=None):
+    """
+    Advance the warning state machine for a set of markets at once.
+    
+    Markets move Okay/Pending → Warning (WARNING_ENTERED), Warning → Okay
+    (WARNING_CLEARED) or stay in Warning (WARNING_PERSISTENT every
+    PERSISTENT_LOG_INTERVAL cycles, alert at ALERT_THRESHOLD_CYCLES unless
+    inside the cooldown). Markets without scrape data are left untouched.
+    Each market must be evaluated exactly once per cycle.
+    
+    Args:
+        state: Health state from init_health_state (updated in place)
+        cycle_number: Current cycle number
+        now: Evaluation time in epoch seconds (defaults to time.time())
+        symbols: Markets to evaluate (defaults to all markets)
+        
+    Returns:
+        Tuple of (log_events, alerts): log_event and send_warning_alert
+        keyword argument dicts, ordered by market
+    """
+    if now is None:
+        now = time.time()
+    
+    has_data = state['has_data']
+    if symbols is not None:
+        selected = np.zeros(len(has_data), dtype=bool)
+        selected[[state['index'][symbol] for symbol in symbols]] = True
+        has_data = has_data & selected
+    
+    clean = state['clean_status']
+    prev = state['previous_status']
+    consecutive = state['consecutive_warning_cycles']
+    last_alert = state['last_alert_sent_time']
+    
+    # Transition masks
+    entered = has_data & (clean == HEALTH_WARNING) & (prev != HEALTH_WARNING)
+    cleared = has_data & (clean == HEALTH_OKAY) & (prev == HEALTH_WARNING)
+    persists = has_data & (clean == HEALTH_WARNING) & (prev == HEALTH_WARNING)
+    
+    persist_cycles = consecutive + persists
+    cooled_down = np.isnan(last_alert) | (now - last_alert >= ALERT_COOLDOWN_MINUTES * 60)
+    alert_due = persists & (persist_cycles == ALERT_THRESHOLD_CYCLES) & cooled_down
+    persistent_log = persists & (persist_cycles % PERSISTENT_LOG_INTERVAL == 0)
+    
+    def metrics(i):
+        dws_value = state['dws_value'][i]
+        return {
+            'symbol': state['symbols'][i],
+            'current_spread': round(float(state['current_spread'][i]), 4),
+            'target_spread': float(state['target_spread'][i]),
+            'percent_diff': round(float(state['percent_diff'][i]), 2),
+            'dws': None if np.isnan(dws_value) else round(float(dws_value), 4),
+            'depth_25': float(state['depth_1pct'][i]) or 0,
+            'depth_50': float(state['depth_2pct'][i]) or 0
+        }
+    
+    def reason(i):
+        return warning_reason(state['is_poor_spread'][i], float(state['percent_diff'][i]))
+    
+    events = []
+    for i in np.flatnonzero(entered):
+        events.append((i, {**metrics(i), 'event_type': 'WARNING_ENTERED',
+                           'duration_cycles': 1, 'notes': reason(i)}))
+    
+    for i in np.flatnonzero(cleared):
+        duration_cycles = int(consecutive[i])
+        duration_minutes = int((now - state['warning_start_time'][i]) / 60)
+        events.append((i, {**metrics(i), 'event_type': 'WARNING_CLEARED',
+                           'duration_cycles': duration_cycles,
+                           'notes': f"Returned to healthy after {duration_cycles} cycles ({duration_minutes} minutes)"}))
+    
+    for i in np.flatnonzero(persistent_log):
+        cycles = int(persist_cycles[i])
+        events.append((i, {**metrics(i), 'event_type': 'WARNING_PERSISTENT',
+                           'duration_cycles': cycles,
+                           'notes': f"Still unhealthy after {cycles} cycles"}))
+    
+    events.sort(key=lambda e: e[0])
+    
+    alerts = [
+        {
+            'symbol': state['symbols'][i],
+            'current_spread': float(state['current_spread'][i]),
+            'target_spread': float(state['target_spread'][i]),
+            'percent_diff': float(state['percent_diff'][i]),
+            'dws': state['dws_display'][i],
+            'depth_25': state['depth_1pct_display'][i],
+            'depth_50': state['depth_2pct_display'][i],
+            'consecutive_cycles': int(persist_cycles[i]),
+            'warning_start_time': datetime.fromtimestamp(state['warning_start_time'][i]),
+            'reason': reason(i)
+        }
+        for i in np.flatnonzero(alert_due)
+    ]
+    
+    # Apply transitions
+    state['warning_start_time'][entered] = now
+    state['warning_start_cycle'][entered] = cycle_number
+    consecutive[entered] = 1
+    
+    consecutive[cleared] = 0
+    state['warning_start_time'][cleared] = np.nan
+    state['warning_start_cycle'][cleared] = -1
+    last_alert[cleared] = np.nan
+    
+    consecutive[persists] += 1
+    
+    prev[has_data] = clean[has_data]
+    
+    return [e for _, e in events], alerts
+
+
+def mark_alert_sent(state, symbol, now=None):
+    """Record that a warning alert was delivered for a market."""
+    state['last_alert_sent_time'][state['index'][symbol]] = time.time() if now is None else now
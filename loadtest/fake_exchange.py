@@ -0,0 +1,209 @@
+"""
+Simulated Quidax trade pages for load testing the orderbook monitor.
+
+Serves /en_US/trade/<SYMBOL> pages that render the same
+.newTrade-depth-block.depath-index-container markup the monitor scrapes,
+with configurable book size, update rate, latency and failure injection,
+plus /api/v1/markets/tickers with best bid/ask for the pre-screen.
+Every page request is recorded so the load test can derive cycle time and
+per-market time from the monitor's request pattern.
+
+Usage:
+    python loadtest/fake_exchange.py --pairs 200 --port 8600
+"""
+import argparse
+import html
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeExchange:
+    """Orderbook state and request log for a set of simulated markets."""
+    
+    def __init__(self, symbols, levels=20, update_interval=1.0, latency_ms=0,
+                 render_delay_ms=200, failure_rate=0.0, seed=None):
+        """
+        Args:
+            symbols: List of trading pair symbols to serve
+            levels: Price levels per side of each book
+            update_interval: Seconds between book updates per market
+            latency_ms: Server-side delay before responding to a page request
+            render_delay_ms: Client-side delay before the book appears (simulates the SPA)
+            failure_rate: Probability a page request fails (HTTP 500 or a book that never renders)
+            seed: Random seed for reproducible books and failures
+        """
+        self.symbols = set(symbols)
+        self.levels = levels
+        self.update_interval = update_interval
+        self.latency_ms = latency_ms
+        self.render_delay_ms = render_delay_ms
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.books = {}
+        self.requests = []  # (timestamp, symbol)
+    
+    def get_book(self, symbol):
+        """Get a market's book, random-walking it if it is older than update_interval."""
+        now = time.time()
+        book = self.books.get(symbol)
+        if book is not None and now - book['updated'] < self.update_interval:
+            return book
+        
+        mid = book['mid'] * (1 + self.rng.gauss(0, 0.001)) if book else self.rng.uniform(0.5, 50_000)
+        spread_pct = self.rng.uniform(0.05, 1.0)
+        tick = mid * spread_pct / 100 / 2
+        book = {
+            'mid': mid,
+            'spread_pct': spread_pct,
+            'asks': [(mid + tick * (1 + i), self.rng.uniform(0.01, 100)) for i in range(self.levels)],
+            'bids': [(mid - tick * (1 + i), self.rng.uniform(0.01, 100)) for i in range(self.levels)],
+            'updated': now
+        }
+        self.books[symbol] = book
+        return book
+    
+    def render_page(self, symbol, fail_render=False):
+        """Render a trade page whose orderbook appears after render_delay_ms."""
+        with self.lock:
+            book = self.get_book(symbol)
+        
+        def row(price, amount):
+            return f"<div><span>{price:,.6f}</span> <span>{amount:.4f}</span> <span>{price * amount:,.2f}</span></div>"
+        
+        rows = ["<div><span>Price</span> <span>Amount</span> <span>Total</span></div>"]
+        rows += [row(price, amount) for price, amount in sorted(book['asks'], reverse=True)]
+        rows.append(f"<div>{book['mid']:,.6f} (+{book['spread_pct']:.2f}%)</div>")
+        rows.append("<div>Spread</div>")
+        rows += [row(price, amount) for price, amount in book['bids']]
+        
+        # A failed render never fills the container, so the monitor times out
+        script = "" if fail_render else f"""
+<script>
+setTimeout(function() {{
+    document.getElementById('book').innerHTML = {json.dumps("".join(rows))};
+}}, {self.render_delay_ms});
+</script>"""
+        
+        return f"""<!DOCTYPE html>
+<html><head><title>{html.escape(symbol)}</title></head>
+<body>
+<div id="book" class="newTrade-depth-block depath-index-container"></div>
+{script}
+</body></html>"""
+    
+    def render_tickers(self):
+        """Render best bid/ask for every market in the Quidax tickers format."""
+        with self.lock:
+            books = {symbol: self.get_book(symbol) for symbol in self.symbols}
+        
+        return json.dumps({
+            'status': 'success',
+            'data': {
+                symbol.replace('_', '').lower(): {
+                    'at': int(book['updated']),
+                    'ticker': {'buy': f"{book['bids'][0][0]:.6f}", 'sell': f"{book['asks'][0][0]:.6f}"}
+                }
+                for symbol, book in books.items()
+            }
+        })
+    
+    def record_request(self, symbol):
+        with self.lock:
+            self.requests.append((time.time(), symbol))
+    
+    def get_requests(self):
+        with self.lock:
+            return list(self.requests)
+
+
+def make_handler(exchange):
+    """Build a request handler class bound to a FakeExchange."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/api/v1/markets/tickers"):
+                self.send_body(exchange.render_tickers().encode(), "application/json")
+                return
+            
+            prefix = "/en_US/trade/"
+            if not self.path.startswith(prefix):
+                self.send_error(404)
+                return
+            
+            symbol = self.path[len(prefix):].split("?")[0]
+            if symbol not in exchange.symbols:
+                self.send_error(404)
+                return
+            
+            exchange.record_request(symbol)
+            if exchange.latency_ms:
+                time.sleep(exchange.latency_ms / 1000)
+            
+            failed = exchange.rng.random() < exchange.failure_rate
+            if failed and exchange.rng.random() < 0.5:
+                self.send_error(500)
+                return
+            
+            self.send_body(exchange.render_page(symbol, fail_render=failed).encode(), "text/html; charset=utf-8")
+        
+        def send_body(self, body, content_type):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    return Handler
+
+
+def start_server(exchange, port=0):
+    """
+    Serve a FakeExchange on a background thread.
+    
+    Args:
+        exchange: FakeExchange instance
+        port: Port to listen on (0 picks a free port)
+        
+    Returns:
+        ThreadingHTTPServer instance (use server.server_address for the port)
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(exchange))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_symbols(count):
+    """Generate synthetic trading pair symbols."""
+    return [f"SIM{i:04d}_USDT" for i in range(count)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve simulated Quidax trade pages")
+    parser.add_argument("--pairs", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--levels", type=int, default=20)
+    parser.add_argument("--update-interval", type=float, default=1.0)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--render-delay-ms", type=int, default=200)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    
+    exchange = FakeExchange(
+        make_symbols(args.pairs), levels=args.levels, update_interval=args.update_interval,
+        latency_ms=args.latency_ms, render_delay_ms=args.render_delay_ms,
+        failure_rate=args.failure_rate
+    )
+    server = start_server(exchange, args.port)
+    print(f"Serving {args.pairs} markets at http://127.0.0.1:{args.port}/en_US/trade/")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,289 @@
+"""
+Scaling load test for the orderbook monitor.
+
+For each pair count, starts a FakeExchange, runs dashboard.py under
+Streamlit against it (MONITOR_BASE_URL / MONITOR_PAIRS_FILE), presses
+"Start Scraping" from a headless browser, and measures cycle time,
+per-market scrape time, CPU and memory of the monitor's process tree
+(Streamlit, chromedriver and Chrome) over a number of cycles.
+
+Usage:
+    python loadtest/run_loadtest.py --pairs 50 200 500 --cycles 3
+"""
+import argparse
+import csv
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_exchange import FakeExchange, make_symbols, start_server
+
+DASHBOARD_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dashboard.py")
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+# --- Process Sampling Functions ---
+def get_process_tree(pid):
+    """Get a process id and all of its descendants from /proc."""
+    pids = [pid]
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                for child in f.read().split():
+                    pids.extend(get_process_tree(int(child)))
+    except (OSError, ValueError):
+        pass
+    return pids
+
+
+def sample_process_tree(pid):
+    """
+    Sample CPU time and RSS of a process tree.
+    
+    Returns:
+        Tuple of (total CPU seconds, total RSS in bytes)
+    """
+    cpu_seconds, rss = 0.0, 0
+    for tree_pid in get_process_tree(pid):
+        try:
+            with open(f"/proc/{tree_pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            cpu_seconds += (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+            with open(f"/proc/{tree_pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        rss += int(line.split()[1]) * 1024
+        except (OSError, ValueError, IndexError):
+            continue
+    return cpu_seconds, rss
+
+
+# --- Harness Functions ---
+def get_free_port():
+    """Get a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_url(url, timeout):
+    """Poll a URL until it answers 200 or the timeout expires."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=2) as response:
+                if response.status == 200:
+                    return True
+        except OSError:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def read_cycle_stats(workdir):
+    """Read every cycle stats row the monitor has written in its working directory."""
+    metrics_dir = os.path.join(workdir, "logs", "metrics")
+    rows = []
+    if os.path.exists(metrics_dir):
+        for name in sorted(os.listdir(metrics_dir)):
+            if name.startswith("cycles_"):
+                with open(os.path.join(metrics_dir, name), newline='') as f:
+                    rows.extend(csv.DictReader(f))
+    return rows
+
+
+def summarize_cycles(cycles):
+    """
+    Summarize measured cycle stats rows.
+    
+    Cycles without page loads (every market skipped by an open circuit or the
+    pre-screen) have empty scrape timings; they are counted as idle_cycles and
+    left out of the scrape timing figures, which are None if every cycle was idle.
+    
+    Returns:
+        Dict of cycle, scrape and skip metrics
+    """
+    durations = [float(c['duration_s']) for c in cycles]
+    page_loads = sum(int(c['page_loads']) for c in cycles)
+    scrape_means = [float(c['scrape_mean_s']) for c in cycles if c['scrape_mean_s']]
+    scrape_p95s = [float(c['scrape_p95_s']) for c in cycles if c['scrape_p95_s']]
+    
+    return {
+        'cycles_measured': len(cycles),
+        'idle_cycles': len(cycles) - len(scrape_means),
+        'cycle_mean_s': round(sum(durations) / len(durations), 2),
+        'cycle_max_s': round(max(durations), 2),
+        'pages_per_s': round(page_loads / sum(durations), 2) if sum(durations) else 0.0,
+        'scrape_mean_s': round(sum(scrape_means) / len(scrape_means), 3) if scrape_means else None,
+        'scrape_p95_s': round(max(scrape_p95s), 3) if scrape_p95s else None,
+        'scrape_failures': sum(int(c['scrape_failures']) for c in cycles),
+        'circuit_skipped': sum(int(c['circuit_skipped']) for c in cycles),
+        'prescreen_skipped': sum(int(c['prescreen_skipped']) for c in cycles)
+    }
+
+
+def start_monitor(workdir, base_url, ticker_url, pairs_file, port, prescreen):
+    """
+    Launch dashboard.py under Streamlit against the simulator, with Telegram
+    disabled and dummy secrets.
+    
+    Returns:
+        Popen of the Streamlit process (in its own process group)
+    """
+    os.makedirs(os.path.join(workdir, ".streamlit"), exist_ok=True)
+    with open(os.path.join(workdir, ".streamlit", "secrets.toml"), "w") as f:
+        f.write('TELEGRAM_BOT_TOKEN = "loadtest"\nTELEGRAM_CHAT_ID = "loadtest"\n')
+    
+    env = dict(os.environ, MONITOR_BASE_URL=base_url, MONITOR_TICKER_URL=ticker_url,
+               MONITOR_PAIRS_FILE=pairs_file, TELEGRAM_ENABLED="false",
+               PRESCREEN_ENABLED="true" if prescreen else "false")
+    return subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", DASHBOARD_PATH,
+         "--server.headless", "true", "--server.port", str(port),
+         "--browser.gatherUsageStats", "false"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+
+def press_start(app_url):
+    """Open the Streamlit app in a headless browser and press Start Scraping."""
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    browser = webdriver.Chrome(options=options)
+    browser.get(app_url)
+    button = WebDriverWait(browser, 60).until(
+        EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'Start Scraping')]"))
+    )
+    button.click()
+    return browser
+
+
+def run_scenario(pair_count, args):
+    """
+    Run the monitor against a simulated exchange with pair_count markets.
+    
+    Returns:
+        Dict of scaling metrics for the scenario
+    """
+    workdir = tempfile.mkdtemp(prefix=f"loadtest_{pair_count}_")
+    symbols = make_symbols(pair_count)
+    
+    pairs_file = os.path.join(workdir, "pairs.csv")
+    with open(pairs_file, "w", newline='') as f:
+        csv.writer(f).writerows([[symbol, args.target_spread] for symbol in symbols])
+    
+    exchange = FakeExchange(
+        symbols, levels=args.levels, update_interval=args.update_interval,
+        latency_ms=args.latency_ms, render_delay_ms=args.render_delay_ms,
+        failure_rate=args.failure_rate, seed=pair_count
+    )
+    server = start_server(exchange)
+    exchange_url = f"http://127.0.0.1:{server.server_address[1]}"
+    
+    app_port = get_free_port()
+    monitor = start_monitor(workdir, f"{exchange_url}/en_US/trade/", f"{exchange_url}/api/v1/markets/tickers",
+                            pairs_file, app_port, args.prescreen)
+    browser = None
+    
+    try:
+        app_url = f"http://127.0.0.1:{app_port}"
+        if not wait_for_url(f"{app_url}/_stcore/health", 60):
+            raise RuntimeError("Streamlit did not start")
+        browser = press_start(app_url)
+        
+        # Warm-up: measure from the end of the first full cycle
+        deadline = time.time() + args.timeout
+        while len(read_cycle_stats(workdir)) < args.warmup_cycles and time.time() < deadline:
+            time.sleep(1)
+        
+        cpu_start, _ = sample_process_tree(monitor.pid)
+        wall_start = time.time()
+        requests_start = len(exchange.get_requests())
+        rss_samples = []
+        
+        target_rows = args.warmup_cycles + args.cycles
+        while len(read_cycle_stats(workdir)) < target_rows and time.time() < deadline:
+            rss_samples.append(sample_process_tree(monitor.pid)[1])
+            time.sleep(1)
+        
+        cpu_end, rss_end = sample_process_tree(monitor.pid)
+        rss_samples.append(rss_end)
+        wall = time.time() - wall_start
+        
+        cycles = read_cycle_stats(workdir)[args.warmup_cycles:target_rows]
+        if not cycles:
+            raise RuntimeError(f"No cycles completed within {args.timeout} s")
+        
+        return {
+            'pairs': pair_count,
+            **summarize_cycles(cycles),
+            'requests_served': len(exchange.get_requests()) - requests_start,
+            'cpu_cores': round((cpu_end - cpu_start) / wall, 2),
+            'rss_mean_mb': round(sum(rss_samples) / len(rss_samples) / 1024 ** 2, 1),
+            'rss_peak_mb': round(max(rss_samples) / 1024 ** 2, 1)
+        }
+    
+    finally:
+        if browser is not None:
+            browser.quit()
+        try:
+            os.killpg(monitor.pid, signal.SIGTERM)
+            monitor.wait(timeout=30)
+        except (ProcessLookupError, subprocess.TimeoutExpired):
+            os.killpg(monitor.pid, signal.SIGKILL)
+        server.shutdown()
+
+
+def print_report(results):
+    """Print scenario results as an aligned table."""
+    if not results:
+        return
+    columns = list(results[0])
+    widths = {c: max(len(c), *(len(str(r[c])) for r in results)) for c in columns}
+    print("  ".join(c.rjust(widths[c]) for c in columns))
+    for result in results:
+        print("  ".join(str(result[c]).rjust(widths[c]) for c in columns))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scaling load test for the orderbook monitor")
+    parser.add_argument("--pairs", type=int, nargs="+", default=[50, 200, 500],
+                        help="Pair counts to test")
+    parser.add_argument("--cycles", type=int, default=3, help="Cycles measured per scenario")
+    parser.add_argument("--warmup-cycles", type=int, default=1, help="Cycles discarded before measuring")
+    parser.add_argument("--levels", type=int, default=20, help="Price levels per side")
+    parser.add_argument("--update-interval", type=float, default=1.0, help="Seconds between book updates")
+    parser.add_argument("--latency-ms", type=int, default=50, help="Server response delay")
+    parser.add_argument("--render-delay-ms", type=int, default=200, help="Delay before the book renders")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Probability a page load fails")
+    parser.add_argument("--target-spread", type=float, default=0.5, help="Target spread %% for every pair")
+    parser.add_argument("--prescreen", action="store_true", help="Enable the ticker pre-screen")
+    parser.add_argument("--timeout", type=float, default=3600, help="Seconds allowed per scenario")
+    parser.add_argument("--output", default="loadtest_results.json", help="Where to write the results")
+    args = parser.parse_args()
+    
+    results = []
+    for pair_count in args.pairs:
+        print(f"Running {pair_count} pairs...", flush=True)
+        results.append(run_scenario(pair_count, args))
+    
+    print_report(results)
+    with open(args.output, "w") as f:
+        json.dump({'settings': vars(args), 'results': results}, f, indent=2)
+    print(f"Results written to {args.output}")
@@ -0,0 +1,276 @@
+"""
+Orderbook archive: every scraped book stored as zlib-compressed keyframes
+plus level-wise deltas in one append-only file per market and day.
+
+Kept free of Streamlit and Selenium so post-mortem scripts and
+tests/test_orderbook_archive.py can import it on its own.
+"""
+import json
+import os
+import struct
+import time
+import zlib
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+# Orderbook Archive Configuration
+ARCHIVE_ENABLED = True            # Keep every scraped orderbook for post-mortems
+ARCHIVE_DIRECTORY = os.path.join("logs", "archive")  # Under dashboard.py's LOG_DIRECTORY
+ARCHIVE_KEYFRAME_INTERVAL = 30    # Full snapshot every 30 scrapes, level deltas in between
+ARCHIVE_FLUSH_RECORDS = 5         # Write a market's buffered snapshots to disk every 5 scrapes
+ARCHIVE_FLUSH_SECONDS = 120       # ...or once the oldest buffered snapshot is 2 minutes old
+ARCHIVE_CHUNK_HEADER = struct.Struct("<ddQI")  # First timestamp, last timestamp, keyframe chunk offset, compressed length
+
+
+def get_archive_filepath(symbol, date_str):
+    """Get the orderbook archive file path for a market and date (YYYY-MM-DD)."""
+    os.makedirs(ARCHIVE_DIRECTORY, exist_ok=True)
+    return os.path.join(ARCHIVE_DIRECTORY, f"{symbol}_{date_str}.obz")
+
+
+def orderbook_levels(levels_df):
+    """Convert an asks/bids DataFrame to a dict of price -> [amount, total]."""
+    levels_df = levels_df.dropna(subset=['price'])
+    return {
+        float(price): [amount, total]
+        for price, amount, total in zip(levels_df['price'], levels_df['amount'], levels_df['total'])
+    }
+
+
+def diff_levels(previous, current):
+    """
+    Diff two price level dicts.
+    
+    Returns:
+        Tuple of (list of [price, amount, total] added or changed, list of removed prices)
+    """
+    changed = [[price, *level] for price, level in current.items() if previous.get(price) != level]
+    removed = [price for price in previous if price not in current]
+    return changed, removed
+
+
+def init_orderbook_archive():
+    """Create empty archive writer state."""
+    return {'markets': {}, 'checked_files': set()}
+
+
+def get_valid_archive_length(f):
+    """
+    Walk an archive file's chunk headers and return the length of its complete chunks.
+    
+    Args:
+        f: Archive file opened for binary reading
+        
+    Returns:
+        Offset just past the last chunk whose header and payload are complete
+    """
+    file_size = f.seek(0, os.SEEK_END)
+    valid_length = 0
+    f.seek(0)
+    while True:
+        header = f.read(ARCHIVE_CHUNK_HEADER.size)
+        if len(header) < ARCHIVE_CHUNK_HEADER.size:
+            break
+        length = ARCHIVE_CHUNK_HEADER.unpack(header)[3]
+        if f.tell() + length > file_size:
+            break
+        valid_length = f.seek(length, os.SEEK_CUR)
+    return valid_length
+
+
+def repair_archive_file(path):
+    """Truncate a chunk left half-written by a crash so new chunks can be appended after it."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r+b') as f:
+        valid_length = get_valid_archive_length(f)
+        if valid_length < f.seek(0, os.SEEK_END):
+            f.truncate(valid_length)
+
+
+def flush_archive_chunk(archive, symbol):
+    """
+    Compress a market's buffered records and append them to disk as one chunk.
+    
+    Every chunk header carries the file offset of the chunk holding its
+    keyframe, so a reader can replay a keyframe group that was written out
+    over several chunks.
+    """
+    market = archive['markets'].get(symbol)
+    if not market or not market['records']:
+        return
+    
+    records = market['records']
+    payload = zlib.compress(json.dumps(records, separators=(',', ':')).encode(), 6)
+    
+    # A previous run may have died mid-chunk, drop the partial chunk before appending
+    path = get_archive_filepath(symbol, market['day'])
+    if path not in archive['checked_files']:
+        repair_archive_file(path)
+        archive['checked_files'].add(path)
+    
+    with open(path, 'ab') as f:
+        offset = f.seek(0, os.SEEK_END)
+        if market['keyframe_offset'] is None:
+            market['keyframe_offset'] = offset
+        f.write(ARCHIVE_CHUNK_HEADER.pack(records[0]['t'], records[-1]['t'],
+                                          market['keyframe_offset'], len(payload)))
+        f.write(payload)
+    
+    market['records'] = []
+
+
+def flush_orderbook_archive(archive, older_than=None):
+    """
+    Write out every market's buffered records.
+    
+    Args:
+        archive: Archive state from init_orderbook_archive
+        older_than: Only flush markets whose oldest buffered record is before
+            this epoch time (defaults to flushing everything)
+    """
+    for symbol, market in archive['markets'].items():
+        if older_than is None or (market['records'] and market['records'][0]['t'] < older_than):
+            flush_archive_chunk(archive, symbol)
+
+
+def archive_orderbook(archive, symbol, asks_df, bids_df, spread_df, timestamp=None):
+    """
+    Buffer a parsed orderbook snapshot as a keyframe or as a level-wise delta.
+    
+    A new keyframe begins every ARCHIVE_KEYFRAME_INTERVAL snapshots and at
+    each day rollover. Buffered records are written out every
+    ARCHIVE_FLUSH_RECORDS snapshots, and any market's buffer older than
+    ARCHIVE_FLUSH_SECONDS is written out too, so a crash loses at most that
+    much history.
+    
+    Args:
+        archive: Archive state from init_orderbook_archive (updated in place)
+        symbol: Trading pair symbol
+        asks_df: DataFrame with ask orders (price, amount, total)
+        bids_df: DataFrame with bid orders (price, amount, total)
+        spread_df: DataFrame with spread_price and spread_percent
+        timestamp: Snapshot time in epoch seconds (defaults to time.time())
+    """
+    if not ARCHIVE_ENABLED:
+        return
+    
+    timestamp = time.time() if timestamp is None else timestamp
+    day = datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
+    asks = orderbook_levels(asks_df)
+    bids = orderbook_levels(bids_df)
+    spread = [
+        None if pd.isna(spread_df['spread_price'][0]) else float(spread_df['spread_price'][0]),
+        None if pd.isna(spread_df['spread_percent'][0]) else float(spread_df['spread_percent'][0])
+    ]
+    
+    market = archive['markets'].get(symbol)
+    if market is None or market['day'] != day or market['since_keyframe'] >= ARCHIVE_KEYFRAME_INTERVAL:
+        if market is not None:
+            flush_archive_chunk(archive, symbol)
+        market = archive['markets'][symbol] = {
+            'day': day, 'records': [], 'since_keyframe': 0, 'keyframe_offset': None
+        }
+        record = {
+            't': timestamp,
+            'asks': [[price, *level] for price, level in asks.items()],
+            'bids': [[price, *level] for price, level in bids.items()],
+            'spread': spread
+        }
+    else:
+        asks_set, asks_del = diff_levels(market['asks'], asks)
+        bids_set, bids_del = diff_levels(market['bids'], bids)
+        record = {'t': timestamp}
+        if asks_set:
+            record['asks_set'] = asks_set
+        if asks_del:
+            record['asks_del'] = asks_del
+        if bids_set:
+            record['bids_set'] = bids_set
+        if bids_del:
+            record['bids_del'] = bids_del
+        if spread != market['spread']:
+            record['spread'] = spread
+    
+    market['records'].append(record)
+    market['since_keyframe'] += 1
+    market['asks'], market['bids'], market['spread'] = asks, bids, spread
+    
+    if len(market['records']) >= ARCHIVE_FLUSH_RECORDS:
+        flush_archive_chunk(archive, symbol)
+    flush_orderbook_archive(archive, older_than=timestamp - ARCHIVE_FLUSH_SECONDS)
+
+
+def read_archived_orderbook(symbol, timestamp):
+    """
+    Reconstruct the most recent archived orderbook at or before a timestamp.
+    
+    Only chunk headers are read until the last chunk starting at or before
+    the timestamp is found; the chunks from its keyframe up to it are then
+    decompressed and replayed. A chunk cut short by a crash ends the file
+    (the writer truncates it before appending again).
+    
+    Args:
+        symbol: Trading pair symbol
+        timestamp: Time in epoch seconds
+        
+    Returns:
+        Tuple of (asks_df, bids_df, spread_df, snapshot timestamp), or None if
+        nothing was archived before the timestamp
+    """
+    day = datetime.fromtimestamp(timestamp).date()
+    
+    # The book at the start of a day may still live in the previous day's file
+    for date in (day, day - timedelta(days=1)):
+        path = os.path.join(ARCHIVE_DIRECTORY, f"{symbol}_{date.isoformat()}.obz")
+        if not os.path.exists(path):
+            continue
+        
+        keyframe_offset, chunk_end = None, None
+        with open(path, 'rb') as f:
+            valid_length = get_valid_archive_length(f)
+            f.seek(0)
+            while f.tell() < valid_length:
+                first_ts, _, chunk_keyframe, length = ARCHIVE_CHUNK_HEADER.unpack(f.read(ARCHIVE_CHUNK_HEADER.size))
+                if first_ts > timestamp:
+                    break
+                keyframe_offset, chunk_end = chunk_keyframe, f.tell() + length
+                f.seek(length, os.SEEK_CUR)
+            
+            if keyframe_offset is None:
+                continue
+            records = []
+            f.seek(keyframe_offset)
+            while f.tell() < chunk_end:
+                _, _, _, length = ARCHIVE_CHUNK_HEADER.unpack(f.read(ARCHIVE_CHUNK_HEADER.size))
+                try:
+                    records.extend(json.loads(zlib.decompress(f.read(length))))
+                except (zlib.error, ValueError):
+                    # Corrupt chunk, replay what was read before it
+                    break
+        
+        asks, bids, spread, snapshot_ts = {}, {}, [None, None], None
+        for record in records:
+            if record['t'] > timestamp:
+                break
+            if 'asks' in record:
+                asks = {price: (amount, total) for price, amount, total in record['asks']}
+                bids = {price: (amount, total) for price, amount, total in record['bids']}
+            for side, levels in (('asks', asks), ('bids', bids)):
+                for price in record.get(f'{side}_del', []):
+                    levels.pop(price, None)
+                for price, amount, total in record.get(f'{side}_set', []):
+                    levels[price] = (amount, total)
+            spread = record.get('spread', spread)
+            snapshot_ts = record['t']
+        
+        def to_df(levels):
+            rows = [{"price": price, "amount": amount, "total": total} for price, (amount, total) in levels.items()]
+            return pd.DataFrame(rows, columns=["price", "amount", "total"]).sort_values(
+                "price", ascending=False).reset_index(drop=True)
+        
+        spread_df = pd.DataFrame([{"spread_price": spread[0], "spread_percent": spread[1]}])
+        return to_df(asks), to_df(bids), spread_df, snapshot_ts
+    
+    return None
@@ -0,0 +1,237 @@
+"""
+Replay test for the columnar health state machine.
+
+Random multi-cycle sequences are fed both to health.py and to a copy of the
+original per-market dict loop from dashboard.py, and the log rows and alerts
+they produce must be identical. Each cycle evaluates every market once, either
+all together or one market at a time in random order as the pipeline does.
+"""
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from health import (
+    ALERT_THRESHOLD_CYCLES, ALERT_COOLDOWN_MINUTES, PERSISTENT_LOG_INTERVAL,
+    init_health_state, record_cycle_data, evaluate_health_transitions, mark_alert_sent
+)
+
+SYMBOLS = ['btcusdt', 'ethusdt', 'solusdt', 'usdtngn', 'xrpusdt', 'dogeusdt']
+SEQUENCES = 300
+CYCLES = 40
+
+
+# --- Reference Implementation ---
+def reference_health_tracking(symbols):
+    """Per-market health tracking dicts as the original loop created them."""
+    return {
+        symbol: {
+            'previous_status': 'Pending',
+            'consecutive_warning_cycles': 0,
+            'warning_start_time': None,
+            'warning_start_cycle': None,
+            'last_alert_sent_time': None
+        }
+        for symbol in symbols
+    }
+
+
+def reference_evaluate(health_tracking, symbols, cycle_number, now, alert_delivered):
+    """
+    The original end-of-cycle loop, with log_event and send_warning_alert
+    replaced by collecting their keyword arguments.
+    """
+    events, alerts = [], []
+
+    for symbol in symbols:
+        health = health_tracking[symbol]
+
+        if 'cycle_data' not in health:
+            continue
+
+        cycle_data = health['cycle_data']
+        clean_status = cycle_data['clean_status']
+        prev_status = health['previous_status']
+
+        reason = ""
+        if cycle_data['is_poor_spread']:
+            if cycle_data['percent_diff_val'] > 100:
+                reason = f"Spread too wide (>{cycle_data['percent_diff_val']:.1f}% above target)"
+            else:
+                reason = f"Spread too tight ({cycle_data['percent_diff_val']:.1f}% below target)"
+
+        dws_numeric = None
+        if cycle_data['dws_value'] is not None:
+            dws_numeric = round(cycle_data['dws_value'], 4)
+
+        metrics = {
+            'symbol': symbol,
+            'current_spread': round(cycle_data['current_spread'], 4),
+            'target_spread': cycle_data['target_spread'],
+            'percent_diff': round(cycle_data['percent_diff'], 2),
+            'dws': dws_numeric,
+            'depth_25': cycle_data['depth_1pct'],
+            'depth_50': cycle_data['depth_2pct']
+        }
+
+        if clean_status == 'Warning' and prev_status != 'Warning':
+            events.append({**metrics, 'event_type': 'WARNING_ENTERED',
+                           'duration_cycles': 1, 'notes': reason})
+            health['warning_start_time'] = now
+            health['warning_start_cycle'] = cycle_number
+            health['consecutive_warning_cycles'] = 1
+
+        elif clean_status == 'Okay' and prev_status == 'Warning':
+            duration_cycles = health['consecutive_warning_cycles']
+            duration_minutes = int((now - health['warning_start_time']).total_seconds() / 60)
+            events.append({**metrics, 'event_type': 'WARNING_CLEARED',
+                           'duration_cycles': duration_cycles,
+                           'notes': f"Returned to healthy after {duration_cycles} cycles ({duration_minutes} minutes)"})
+            health['consecutive_warning_cycles'] = 0
+            health['warning_start_time'] = None
+            health['warning_start_cycle'] = None
+            health['last_alert_sent_time'] = None
+
+        elif clean_status == 'Warning' and prev_status == 'Warning':
+            health['consecutive_warning_cycles'] += 1
+            cycles = health['consecutive_warning_cycles']
+
+            if cycles == ALERT_THRESHOLD_CYCLES:
+                should_alert = True
+                if health['last_alert_sent_time']:
+                    if now - health['last_alert_sent_time'] < timedelta(minutes=ALERT_COOLDOWN_MINUTES):
+                        should_alert = False
+
+                if should_alert:
+                    alerts.append({
+                        'symbol': symbol,
+                        'current_spread': cycle_data['current_spread'],
+                        'target_spread': cycle_data['target_spread'],
+                        'percent_diff': cycle_data['percent_diff'],
+                        'dws': cycle_data['dws_display'],
+                        'depth_25': cycle_data['depth_1pct_display'],
+                        'depth_50': cycle_data['depth_2pct_display'],
+                        'consecutive_cycles': cycles,
+                        'warning_start_time': health['warning_start_time'],
+                        'reason': reason
+                    })
+                    if alert_delivered(symbol):
+                        health['last_alert_sent_time'] = now
+
+            if cycles % PERSISTENT_LOG_INTERVAL == 0:
+                events.append({**metrics, 'event_type': 'WARNING_PERSISTENT',
+                               'duration_cycles': cycles,
+                               'notes': f"Still unhealthy after {cycles} cycles"})
+
+        health['previous_status'] = clean_status
+
+    return events, alerts
+
+
+# --- Replay Helpers ---
+def random_cycle_data(rng, target):
+    """Random scrape result for one market, biased towards long warning streaks."""
+    clean_status = rng.choices(['Okay', 'Warning', 'Pending'], weights=[4, 5, 1])[0]
+    percent_diff = round(rng.uniform(-90, 300), 6)
+    depth_1pct = rng.choice([None, 0, round(rng.uniform(10, 1e6), 2)])
+    depth_2pct = rng.choice([None, 0, round(rng.uniform(10, 1e6), 2)])
+    dws_value = rng.choice([None, rng.uniform(0.01, 5)])
+    return {
+        'clean_status': clean_status,
+        'current_spread': target * (1 + percent_diff / 100),
+        'target_spread': target,
+        'percent_diff': percent_diff,
+        'dws_value': dws_value,
+        'dws_display': f"{dws_value:.4f}%" if dws_value is not None else "--",
+        'depth_1pct': depth_1pct,
+        'depth_2pct': depth_2pct,
+        'depth_1pct_display': f"{depth_1pct:,.0f}" if depth_1pct else "--",
+        'depth_2pct_display': f"{depth_2pct:,.0f}" if depth_2pct else "--",
+        'is_poor_spread': percent_diff > 100 or percent_diff < -40
+    }
+
+
+def replay(seed):
+    """
+    Run one random sequence through both implementations.
+
+    Returns:
+        Tuple of (reference, columnar) lists of (cycle_number, events, alerts)
+    """
+    rng = random.Random(seed)
+    targets = {symbol: rng.choice([0.1, 0.25, 0.5, 1.0]) for symbol in SYMBOLS}
+    delivery = {}
+
+    def alert_delivered(symbol):
+        return delivery[symbol]
+
+    tracking = reference_health_tracking(SYMBOLS)
+    state = init_health_state(SYMBOLS)
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    reference, columnar = [], []
+
+    for cycle_number in range(1, CYCLES + 1):
+        now += timedelta(minutes=rng.choice([1, 2, 5, 20, 45]))
+        epoch = now.timestamp()
+
+        # Some markets are skipped (failed, open circuit, pre-screened) and keep their last data
+        for symbol in SYMBOLS:
+            delivery[symbol] = rng.random() < 0.7
+            if rng.random() < 0.8:
+                data = random_cycle_data(rng, targets[symbol])
+                tracking[symbol]['cycle_data'] = {**data, 'depth_1pct': data['depth_1pct'] or 0,
+                                                  'depth_2pct': data['depth_2pct'] or 0,
+                                                  'percent_diff_val': data['percent_diff']}
+                record_cycle_data(state, symbol, **data)
+
+        events, alerts = reference_evaluate(tracking, SYMBOLS, cycle_number, now, alert_delivered)
+        reference.append((cycle_number, events, alerts))
+
+        # Evaluate every market once, all together or one at a time in random order
+        if rng.random() < 0.5:
+            batches = [None]
+        else:
+            order = SYMBOLS[:]
+            rng.shuffle(order)
+            batches = [[symbol] for symbol in order]
+
+        cycle_events, cycle_alerts = [], []
+        for batch in batches:
+            events, alerts = evaluate_health_transitions(state, cycle_number, now=epoch, symbols=batch)
+            for alert in alerts:
+                if delivery[alert['symbol']]:
+                    mark_alert_sent(state, alert['symbol'], now=epoch)
+            cycle_events.extend(events)
+            cycle_alerts.extend(alerts)
+
+        if batches != [None]:
+            cycle_events.sort(key=lambda e: SYMBOLS.index(e['symbol']))
+            cycle_alerts.sort(key=lambda a: SYMBOLS.index(a['symbol']))
+        columnar.append((cycle_number, cycle_events, cycle_alerts))
+
+    return reference, columnar
+
+
+# --- Tests ---
+def test_replay_matches_original_loop():
+    """Columnar state machine produces the same log rows and alerts as the dict loop."""
+    for seed in range(SEQUENCES):
+        reference, columnar = replay(seed)
+        for (cycle_number, ref_events, ref_alerts), (_, events, alerts) in zip(reference, columnar):
+            assert events == ref_events, f"seed {seed}, cycle {cycle_number}: log rows differ"
+            assert alerts == ref_alerts, f"seed {seed}, cycle {cycle_number}: alerts differ"
+
+
+def test_replay_exercises_every_transition():
+    """The random sequences reach every event type and at least one alert."""
+    event_types = set()
+    alert_count = 0
+    for seed in range(20):
+        reference, _ = replay(seed)
+        for _, events, alerts in reference:
+            event_types.update(e['event_type'] for e in events)
+            alert_count += len(alerts)
+
+    assert event_types == {'WARNING_ENTERED', 'WARNING_CLEARED', 'WARNING_PERSISTENT'}
+    assert alert_count > 0
@@ -0,0 +1,144 @@
+"""
+Round-trip tests for the orderbook archive: keyframe plus delta
+reconstruction, the previous-day fallback and recovery from a chunk left
+half-written by a crash.
+"""
+import os
+import random
+import sys
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import orderbook_archive
+from orderbook_archive import (
+    ARCHIVE_KEYFRAME_INTERVAL, init_orderbook_archive, flush_orderbook_archive,
+    archive_orderbook, read_archived_orderbook
+)
+
+SYMBOL = 'BTC_USDT'
+
+
+@pytest.fixture(autouse=True)
+def archive_directory(tmp_path, monkeypatch):
+    """Write archives to a temporary directory."""
+    monkeypatch.setattr(orderbook_archive, 'ARCHIVE_DIRECTORY', str(tmp_path))
+    return tmp_path
+
+
+# --- Helpers ---
+def random_books(seed, count, start_ts, interval=60):
+    """
+    Generate a random walk of orderbooks.
+
+    Returns:
+        List of (timestamp, asks dict, bids dict, spread list)
+    """
+    rng = random.Random(seed)
+    asks = {round(100 + i * 0.1, 2): (round(rng.uniform(1, 50), 4), 0.0) for i in range(20)}
+    bids = {round(99.9 - i * 0.1, 2): (round(rng.uniform(1, 50), 4), 0.0) for i in range(20)}
+    books = []
+    for k in range(count):
+        for side, low, high in ((asks, 100.0, 105.0), (bids, 95.0, 99.95)):
+            for _ in range(3):
+                side[rng.choice(list(side))] = (round(rng.uniform(1, 50), 4), 0.0)
+            if rng.random() < 0.3:
+                side.pop(rng.choice(list(side)))
+                side[round(rng.uniform(low, high), 2)] = (1.0, 0.0)
+        spread = [round(min(asks) - max(bids), 2), round(rng.uniform(0.05, 0.5), 4)]
+        books.append((start_ts + k * interval, dict(asks), dict(bids), spread))
+    return books
+
+
+def to_frames(asks, bids, spread):
+    """Build the DataFrames parse_orderbook would return for a book."""
+    def frame(levels):
+        return pd.DataFrame([[price, amount, total] for price, (amount, total) in levels.items()],
+                            columns=['price', 'amount', 'total'])
+    return frame(asks), frame(bids), pd.DataFrame([{'spread_price': spread[0], 'spread_percent': spread[1]}])
+
+
+def write_books(archive, books):
+    """Archive a list of books for SYMBOL."""
+    for ts, asks, bids, spread in books:
+        archive_orderbook(archive, SYMBOL, *to_frames(asks, bids, spread), timestamp=ts)
+
+
+def assert_book(result, book):
+    """Check a reconstructed book against the one archived."""
+    ts, asks, bids, spread = book
+    assert result is not None
+    asks_df, bids_df, spread_df, snapshot_ts = result
+    assert snapshot_ts == ts
+    assert {row.price: (row.amount, row.total) for row in asks_df.itertuples()} == asks
+    assert {row.price: (row.amount, row.total) for row in bids_df.itertuples()} == bids
+    assert [spread_df['spread_price'][0], spread_df['spread_percent'][0]] == spread
+
+
+# --- Tests ---
+def test_keyframes_and_deltas_round_trip():
+    """Every archived book is reconstructed exactly, across several keyframe groups."""
+    books = random_books(1, ARCHIVE_KEYFRAME_INTERVAL * 3 + 7, datetime(2026, 1, 5, 8, 0).timestamp())
+    archive = init_orderbook_archive()
+    write_books(archive, books)
+    flush_orderbook_archive(archive)
+
+    for book in books:
+        assert_book(read_archived_orderbook(SYMBOL, book[0] + 30), book)
+    assert read_archived_orderbook(SYMBOL, books[0][0] - 1) is None
+
+
+def test_unflushed_buffer_is_bounded():
+    """Without a final flush (crash), only the last buffered snapshots are missing."""
+    books = random_books(2, 40, datetime(2026, 1, 5, 8, 0).timestamp())
+    archive = init_orderbook_archive()
+    write_books(archive, books)
+
+    unflushed = len(archive['markets'][SYMBOL]['records'])
+    assert unflushed < orderbook_archive.ARCHIVE_FLUSH_RECORDS
+    for book in books[:len(books) - unflushed]:
+        assert_book(read_archived_orderbook(SYMBOL, book[0]), book)
+
+
+def test_previous_day_fallback(archive_directory):
+    """Just after midnight, the last book comes from the previous day's file."""
+    books = random_books(3, 12, datetime(2026, 1, 5, 23, 50).timestamp())
+    archive = init_orderbook_archive()
+    write_books(archive, books)
+    flush_orderbook_archive(archive)
+
+    assert sorted(os.listdir(archive_directory)) == [f'{SYMBOL}_2026-01-05.obz', f'{SYMBOL}_2026-01-06.obz']
+    last_of_day = [book for book in books if book[0] < datetime(2026, 1, 6).timestamp()][-1]
+    assert_book(read_archived_orderbook(SYMBOL, datetime(2026, 1, 6).timestamp() - 1), last_of_day)
+
+    # A new day starts with a keyframe in its own file
+    for book in books:
+        assert_book(read_archived_orderbook(SYMBOL, book[0]), book)
+
+
+def test_append_after_truncated_chunk(archive_directory, monkeypatch):
+    """A restart after a crash mid-chunk drops the partial chunk and keeps everything else readable."""
+    # Chunks of exactly ARCHIVE_FLUSH_RECORDS (5) snapshots: 0-4, 5-9 and 10-11
+    monkeypatch.setattr(orderbook_archive, 'ARCHIVE_FLUSH_SECONDS', float('inf'))
+    start = datetime(2026, 1, 5, 8, 0).timestamp()
+    first_run = random_books(4, 12, start)
+    archive = init_orderbook_archive()
+    write_books(archive, first_run)
+    flush_orderbook_archive(archive)
+
+    path = os.path.join(archive_directory, f'{SYMBOL}_2026-01-05.obz')
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 20)
+
+    # The truncated last chunk is skipped by the reader
+    assert_book(read_archived_orderbook(SYMBOL, first_run[9][0]), first_run[9])
+
+    second_run = random_books(5, 12, first_run[-1][0] + 60)
+    archive = init_orderbook_archive()
+    write_books(archive, second_run)
+    flush_orderbook_archive(archive)
+
+    for book in first_run[:10] + second_run:
+        assert_book(read_archived_orderbook(SYMBOL, book[0]), book)